@@ -1,10 +1,22 @@
-from typing import Dict, List, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Iterator, Optional
 from .confidence_scorer import grade_sentence
 from .clarifier import get_clarifying_questions
-from .generator import generate_pitch_json, generate_email
+from .context import bind_context
+from .deadline import DeadlineExceeded, RequestCancelled, StageBudget
+from .generator import build_email_context, generate_pitch_json, generate_email, stream_email_from_context
 from .improver import improve_pitch_section
 from .llm_router import route_llm_call
 from .matching import match_vc_to_startup_enhanced
+from .outreach import generate_bulk_emails, DEFAULT_CONCURRENCY
+from .profiling import span
+from .speculation import speculator
+
+# Relative share of the request deadline each workflow stage gets
+STAGE_WEIGHTS = {'pitch': 4, 'clarify': 2, 'match': 2, 'email': 2}
+# Optional stages are skipped rather than started with less time than this
+OPTIONAL_STAGE_MIN_SECONDS = 3.0
 
 class PitchAgent:
     def __init__(self):
@@ -29,7 +41,8 @@ class PitchAgent:
         )
         
         # Score each section
-        self.analyze_pitch_confidence()
+        with span('confidence_scoring'):
+            self.analyze_pitch_confidence()
         return self.pitch_data
 
     def analyze_pitch_confidence(self):
@@ -66,15 +79,17 @@ class PitchAgent:
 
     def get_clarifying_questions(self) -> Dict[str, List[str]]:
         """Generate clarifying questions for low-confidence sections."""
+        red_sections = [name for name, score in self.confidence_scores.items() if score['color'] == 'red']
         questions = {}
-        for section_name, score in self.confidence_scores.items():
-            if score['color'] == 'red':
-                section_text = self.pitch_data[section_name]['text']
-                questions[section_name] = get_clarifying_questions(
-                    section_name=section_name,
-                    section_text=section_text,
-                    confidence_score=score
-                )
+        if red_sections:
+            # Issued concurrently so the micro-batcher can pack them into one provider call
+            with ThreadPoolExecutor(max_workers=len(red_sections)) as executor:
+                results = executor.map(bind_context(lambda name: get_clarifying_questions(
+                    section_name=name,
+                    section_text=self.pitch_data[name]['text'],
+                    confidence_score=self.confidence_scores[name]
+                )), red_sections)
+                questions = dict(zip(red_sections, results))
         self.clarifying_questions = questions
         return questions
 
@@ -84,6 +99,7 @@ class PitchAgent:
             raise ValueError(f"Section {section_name} not found in pitch data")
 
         current_text = self.pitch_data[section_name]['text']
+        speculator.discard(section_name, current_text)
         improved_section = improve_pitch_section(
             section_name=section_name,
             current_text=current_text,
@@ -97,6 +113,22 @@ class PitchAgent:
         self.analyze_pitch_confidence()
         return self.pitch_data
 
+    def speculate_regenerations(self) -> int:
+        """Pre-generate regenerations of the weakest sections in the background (spare capacity only)."""
+        return speculator.speculate(self.pitch_data, self.confidence_scores)
+
+    def regenerate_section(self, section_name: str) -> Dict[str, Any]:
+        """Regenerate a section from scratch, served instantly if it was pre-generated."""
+        if section_name not in self.pitch_data:
+            raise ValueError(f"Section {section_name} not found in pitch data")
+
+        regenerated = speculator.regenerate(section_name, self.pitch_data[section_name]['text'])
+        self.pitch_data[section_name]['text'] = regenerated['text']
+
+        # Reanalyze confidence
+        self.analyze_pitch_confidence()
+        return regenerated
+
     def match_investors(self) -> List[Dict[str, Any]]:
         """Find matching investors based on startup info."""
         return match_vc_to_startup_enhanced(
@@ -113,5 +145,98 @@ class PitchAgent:
             investor_name=investor_info.get('name', ''),
             your_name=self.startup_info.get('your_name', ''),
             startup_name=self.startup_info.get('startup_name', ''),
+            your_email=self.startup_info.get('your_email', ''),
+            investor=investor_info
+        )
+
+    def stream_email(self, investor_info: Dict[str, str]) -> Iterator[str]:
+        """Stream the personalized email for a matched investor as it is generated."""
+        context = build_email_context(
+            self.pitch_data,
+            your_name=self.startup_info.get('your_name', ''),
+            startup_name=self.startup_info.get('startup_name', ''),
             your_email=self.startup_info.get('your_email', '')
-        )
\ No newline at end of file
+        )
+        return stream_email_from_context(context, investor_info)
+
+    def generate_bulk_emails(self, investors: List[Dict[str, Any]], llm_top_n: Optional[int] = None,
+                             concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Dict[str, Any]]:
+        """Generate emails for a ranked investor list, yielding each one as it completes."""
+        return generate_bulk_emails(
+            pitch_json=self.pitch_data,
+            investors=investors,
+            your_name=self.startup_info.get('your_name', ''),
+            startup_name=self.startup_info.get('startup_name', ''),
+            your_email=self.startup_info.get('your_email', ''),
+            llm_top_n=llm_top_n,
+            concurrency=concurrency
+        )
+
+    def run_workflow(self, on_stage: Optional[Callable[[str, Any, float], None]] = None) -> Dict[str, Any]:
+        """Run the full pitch pipeline: pitch, clarifying questions, investor matches, email.
+
+        `on_stage(stage, result, seconds)` is called after each stage finishes, which lets
+        callers report partial results and per-stage timings.
+
+        Under a request deadline each stage gets a weighted share of the time left. The pitch
+        is required and may use all of it; clarifying questions, matches and the email are
+        optional and are skipped (listed under 'degraded') when their share runs out, so a
+        slow provider still yields a pitch instead of a timeout. Matching ranks locally and
+        only its LLM insights need time, so it is always attempted.
+        """
+        budget = StageBudget(STAGE_WEIGHTS)
+        degraded: List[str] = []
+
+        def stage(name: str, fn: Callable[[], Any], optional: bool = False, fallback: Any = None,
+                  min_seconds: float = OPTIONAL_STAGE_MIN_SECONDS) -> Any:
+            start = time.perf_counter()
+            with budget.stage(name, bounded=optional) as deadline:
+                try:
+                    if optional and deadline is not None and deadline.remaining() < min_seconds:
+                        deadline.check()
+                        raise DeadlineExceeded(f"Not enough time left for {name}")
+                    with span(f'stage:{name}'):
+                        result = fn()
+                except RequestCancelled:
+                    raise
+                except DeadlineExceeded:
+                    if not optional:
+                        raise
+                    degraded.append(name)
+                    result = fallback
+            if on_stage:
+                on_stage(name, result, time.perf_counter() - start)
+            return result
+
+        # Generate pitch with confidence scoring
+        pitch_data = stage('pitch', self.generate_initial_pitch)
+
+        # Red sections are usually regenerated next; start on the weakest ones while the rest runs
+        self.speculate_regenerations()
+
+        # Get clarifying questions for low-confidence sections
+        questions = stage('clarify', self.get_clarifying_questions, optional=True, fallback={})
+
+        # Get matching investors
+        matches = stage('match', self.match_investors, optional=True, fallback=[], min_seconds=0)
+
+        # Generate email if we have matches
+        email = None
+        if matches:
+            top_investor = {
+                'name': matches[0]['name'],
+                'firm': matches[0]['focus'],
+                'focus': matches[0]['focus'],
+                'stage': matches[0].get('stage', ''),
+                'location': matches[0].get('location', '')
+            }
+            email = stage('email', lambda: self.generate_email(top_investor), optional=True)
+
+        return {
+            'pitch': pitch_data,
+            'confidence_scores': self.confidence_scores,
+            'clarifying_questions': questions,
+            'investor_matches': matches[:5],
+            'email': email,
+            'degraded': degraded
+        }
\ No newline at end of file
@@ -1,31 +1,138 @@
 import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from dotenv import load_dotenv
-import anthropic
+from .json_repair import extract_json
 
-# Load environment variables from .env
-load_dotenv()
+# Used when the router does not pick a model tier
+DEFAULT_MODEL = "claude-3-opus-20240229"
 
-# Initialize Anthropic client with API key
-client = anthropic.Client(api_key=os.getenv("ANTHROPIC_API_KEY"))
+@lru_cache(maxsize=None)
+def get_client():
+    """Build the Anthropic client on first use so importing this module stays cheap."""
+    import anthropic
 
-def call_claude(prompt: str, temperature: float = 0.3, max_tokens: int = 512) -> str:
+    # Load environment variables from .env
+    load_dotenv()
+    return anthropic.Client(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+def _messages(prompt: str, prefix: Optional[str], cache_prefix: bool = False) -> List[Dict[str, Any]]:
+    # The static prefix goes first as its own block. When it is long enough for Claude to
+    # cache (see MIN_CACHEABLE_PREFIX_TOKENS) it is marked as a prompt-cache breakpoint, so
+    # later calls that start with the same block read it from the cache.
+    if prefix:
+        block: Dict[str, Any] = {"type": "text", "text": prefix}
+        if cache_prefix:
+            block["cache_control"] = {"type": "ephemeral"}
+        content = [
+            block,
+            {"type": "text", "text": prompt}
+        ]
+        return [{"role": "user", "content": content}]
+    return [{"role": "user", "content": prompt}]
+
+def _report_usage(response, on_usage: Optional[Callable[[Dict[str, int]], None]]):
+    if on_usage is None or getattr(response, "usage", None) is None:
+        return
+    usage = response.usage
+    cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+    written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    on_usage({
+        # input_tokens excludes cache reads/writes on Claude; report the full prompt size
+        "input_tokens": usage.input_tokens + cached + written,
+        "output_tokens": usage.output_tokens,
+        "cached_input_tokens": cached,
+    })
+
+def call_claude(prompt: str, temperature: float = 0.3, max_tokens: int = 512,
+                prefix: Optional[str] = None, cache_prefix: bool = False,
+                on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                model: Optional[str] = None, timeout: Optional[float] = None) -> str:
     """
     Send a prompt to Anthropic Claude and return the completion.
 
     Args:
-        prompt: The user prompt to send to Claude.
+        prompt: The user prompt to send to Claude (the variable part, if `prefix` is given).
         temperature: Sampling temperature.
         max_tokens: Maximum tokens to sample in the response.
+        prefix: Optional static instructions, sent first as their own content block.
+        cache_prefix: Mark the prefix as a prompt-cache breakpoint (only worth it for
+            prefixes of at least MIN_CACHEABLE_PREFIX_TOKENS).
+        on_usage: Optional callback receiving input/output/cached token counts.
+        model: Model to use (defaults to DEFAULT_MODEL).
+        timeout: Optional request timeout in seconds (the caller's remaining deadline).
 
     Returns:
         The generated text response from Claude, stripped of leading/trailing whitespace.
     """
-    response = client.messages.create(
-        model="claude-3-opus-20240229",
+    response = get_client().messages.create(
+        model=model or DEFAULT_MODEL,
         max_tokens=max_tokens,
         temperature=temperature,
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
+        messages=_messages(prompt, prefix, cache_prefix),
+        **({"timeout": timeout} if timeout is not None else {})
     )
+    _report_usage(response, on_usage)
     return response.content[0].text.strip()
+
+def stream_claude(prompt: str, temperature: float = 0.3, max_tokens: int = 512,
+                  prefix: Optional[str] = None, cache_prefix: bool = False,
+                  on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                  model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Stream a completion from Anthropic Claude, yielding text deltas as they arrive.
+
+    Same arguments as call_claude. Token usage is reported once the stream ends; closing the
+    generator early closes the connection.
+    """
+    with get_client().messages.stream(
+        model=model or DEFAULT_MODEL,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        messages=_messages(prompt, prefix, cache_prefix),
+        **({"timeout": timeout} if timeout is not None else {})
+    ) as stream:
+        for text in stream.text_stream:
+            yield text
+        _report_usage(stream.get_final_message(), on_usage)
+
+def call_claude_json(prompt: str, schema: Dict[str, Any], name: str, temperature: float = 0.3,
+                     max_tokens: int = 512, prefix: Optional[str] = None, cache_prefix: bool = False,
+                     on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                     model: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+    """
+    Send a prompt to Anthropic Claude and return a JSON value matching `schema`.
+
+    Forces a tool call so Claude returns the value as already-parsed tool input. If the
+    reply has no tool_use block, the text is run through the local JSON repairer.
+
+    Args:
+        prompt: The user prompt to send to Claude (the variable part, if `prefix` is given).
+        schema: JSON schema of the expected value (must describe an object).
+        name: Tool name the value is returned under.
+        temperature: Sampling temperature.
+        max_tokens: Maximum tokens to sample in the response.
+        prefix: Optional static instructions, sent first as their own content block.
+        cache_prefix: Mark the prefix as a prompt-cache breakpoint (only worth it for
+            prefixes of at least MIN_CACHEABLE_PREFIX_TOKENS).
+        on_usage: Optional callback receiving input/output/cached token counts.
+        model: Model to use (defaults to DEFAULT_MODEL).
+        timeout: Optional request timeout in seconds (the caller's remaining deadline).
+
+    Returns:
+        The parsed JSON value.
+    """
+    response = get_client().messages.create(
+        model=model or DEFAULT_MODEL,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        tools=[{"name": name, "description": f"Record the {name} result.", "input_schema": schema}],
+        tool_choice={"type": "tool", "name": name},
+        messages=_messages(prompt, prefix, cache_prefix),
+        **({"timeout": timeout} if timeout is not None else {})
+    )
+    _report_usage(response, on_usage)
+    for block in response.content:
+        if block.type == "tool_use":
+            return block.input
+    return extract_json("".join(block.text for block in response.content if block.type == "text"))
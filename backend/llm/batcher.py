@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long the first request of a batch waits for others to join, and the batch size cap
+BATCH_WINDOW_SECONDS = float(os.getenv("PITCHSENSE_BATCH_WINDOW_MS", "30")) / 1000
+BATCH_MAX_ITEMS = int(os.getenv("PITCHSENSE_BATCH_MAX_ITEMS", "16"))
+
+# Only requests this small are worth batching; larger ones go straight to the provider
+SMALL_TASK_MAX_TOKENS = 300
+
+# run_batch(prompts, max_tokens) -> one answer per prompt, or None if the reply could not be split.
+# Prompts are passed through as submitted (strings or rendered templates).
+RunBatch = Callable[[List[Any], List[int]], Optional[List[Any]]]
+
+
+class _Item:
+    def __init__(self, prompt: Any, max_tokens: int):
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.done = threading.Event()
+        self.ok = False
+        self.result: Any = None
+
+
+class _Batch:
+    def __init__(self):
+        self.items: List[_Item] = []
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Collect small requests from concurrent callers and send them as one multi-item call.
+
+    The first caller to arrive opens a batch and waits up to `window` seconds (or until
+    `max_items` callers joined), then runs the whole batch; the others just wait for their
+    answer. If the batch has a single item, or its reply cannot be split back into exactly
+    one answer per item, every caller is told to make its own individual call instead.
+    """
+
+    def __init__(self, name: str, run_batch: RunBatch, window: float = BATCH_WINDOW_SECONDS,
+                 max_items: int = BATCH_MAX_ITEMS):
+        self.name = name
+        self.run_batch = run_batch
+        self.window = window
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        self.batches = 0
+        self.batched_items = 0
+        self.fallbacks = 0
+
+    def submit(self, prompt: Any, max_tokens: int) -> Tuple[bool, Any]:
+        """Returns (True, answer) if the item was answered in a batch, else (False, None)."""
+        item = _Item(prompt, max_tokens)
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            if len(batch.items) >= self.max_items:
+                # Sealed: later callers start a new batch
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._execute(batch.items)
+
+        item.done.wait()
+        return item.ok, item.result
+
+    def _execute(self, items: List[_Item]):
+        answers = None
+        if len(items) > 1:
+            try:
+                answers = self.run_batch([i.prompt for i in items], [i.max_tokens for i in items])
+            except Exception as e:
+                logger.warning(f'Micro-batch {self.name} of {len(items)} failed: {str(e)}')
+            if answers is None or len(answers) != len(items):
+                answers = None
+
+        with self._lock:
+            if answers is not None:
+                self.batches += 1
+                self.batched_items += len(items)
+            elif len(items) > 1:
+                self.fallbacks += 1
+        for i, item in enumerate(items):
+            if answers is not None:
+                item.ok, item.result = True, answers[i]
+            item.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "batched_items": self.batched_items,
+                "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                "fallbacks": self.fallbacks
+            }
+
+
+BATCHERS: Dict[Tuple[str, ...], MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: Tuple[str, ...], run_batch: RunBatch) -> MicroBatcher:
+    """Return the batcher for a (task_type, result kind, model) key, creating it on first use."""
+    with _batchers_lock:
+        if key not in BATCHERS:
+            BATCHERS[key] = MicroBatcher(":".join(key), run_batch)
+        return BATCHERS[key]
+
+
+def batching_stats() -> Dict[str, Dict[str, Any]]:
+    return {batcher.name: batcher.stats() for batcher in BATCHERS.values()}
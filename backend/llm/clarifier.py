@@ -1,43 +1,59 @@
 from typing import List, Dict, Any
-from .llm_router import route_llm_call
+from .llm_router import route_llm_json
+from .prompts import PromptTemplate, register_template
 
-def get_clarifying_questions(section_name: str, section_text: str, confidence_score: Dict[str, Any]) -> List[str]:
-    """Generate clarifying questions for a pitch section marked as red."""
-    prompt = f"""You are an AI pitch advisor helping improve a startup pitch. A section of the pitch has been marked as needing clarification.
-
-Section: {section_name}
-Current text: {section_text}
+QUESTIONS_SCHEMA = {
+    "type": "object",
+    "properties": {"questions": {"type": "array", "items": {"type": "string"}}},
+    "required": ["questions"]
+}
 
-This section was marked as needing improvement because: {confidence_score['reason']}
+CLARIFY_TEMPLATE = register_template(PromptTemplate(
+    name="clarify_question",
+    version="2",
+    prefix="""You are an AI pitch advisor helping improve a startup pitch. A section of the pitch has been marked as needing clarification.
 
 Generate 2-3 specific questions that would help gather information to improve this section. Focus on:
 1. Requesting concrete data and metrics
 2. Clarifying vague or generic statements
 3. Getting specific examples or proof points
 
-Format your response as a Python list of questions only.
+Return the questions as a JSON object of the form {"questions": ["...", "..."]}.
+""",
+    suffix="""
+Section: {section_name}
+Current text: {section_text}
+
+This section was marked as needing improvement because: {reason}
 """
+))
 
-    response = route_llm_call(
-        task_type='clarify_question',
-        prompt=prompt,
-        max_tokens=300
+def get_clarifying_questions(section_name: str, section_text: str, confidence_score: Dict[str, Any]) -> List[str]:
+    """Generate clarifying questions for a pitch section marked as red."""
+    prompt = CLARIFY_TEMPLATE.render(
+        section_name=section_name,
+        section_text=section_text,
+        reason=confidence_score['reason']
     )
 
-    # Convert string response to list of questions
     try:
-        # Clean up the response and evaluate it as a Python list
-        questions_str = response.strip().replace('```python', '').replace('```', '').strip()
-        questions = eval(questions_str)
-        
-        # Validate and clean questions
-        if isinstance(questions, list):
-            return [q.strip() for q in questions if isinstance(q, str)]
+        result = route_llm_json(
+            task_type='clarify_question',
+            prompt=prompt,
+            schema=QUESTIONS_SCHEMA,
+            name='clarifying_questions',
+            max_tokens=300,
+            batch=True
+        )
+    except ValueError:
+        # Nothing recoverable in the reply; the section simply gets no questions
         return []
-    except:
-        # Fallback: split by newlines and clean up
-        questions = response.split('\n')
-        return [q.strip('- ').strip() for q in questions if q.strip('- ').strip()]
+
+    # Accept both the schema shape and a bare list from non-native providers
+    questions = result.get('questions', []) if isinstance(result, dict) else result
+    if isinstance(questions, list):
+        return [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+    return []
 
 def get_clarifying_questions_for_pitch(analyzed_pitch: Dict[str, Any]) -> Dict[str, List[str]]:
     """Generate clarifying questions for all sections with low confidence scores."""
@@ -0,0 +1,25 @@
+import contextvars
+from typing import Any, Callable
+from .profiling import attach_thread
+
+
+def bind_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap `fn` so it runs with the caller's context variables when handed to a thread pool.
+
+    ThreadPoolExecutor does not propagate contextvars, which would silently drop per-request
+    settings (model tier, deadline, profiling) in worker threads. Each call runs in its own
+    copy of the captured context, so concurrent calls never share one Context object.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return ctx.copy().run(_run_attached, fn, *args, **kwargs)
+
+    return run
+
+
+def _run_attached(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Worker threads count towards the request's profile while they run its tasks
+    with attach_thread():
+        return fn(*args, **kwargs)
@@ -0,0 +1,383 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional
+import numpy as np
+from .taxonomy import TAXONOMY_VERSION, primary_sector, sector_mask, stage_mask
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bump whenever the on-disk layout or the cleaning rules change so stale caches get rebuilt
+CACHE_FORMAT_VERSION = 1
+
+DATA_DIR = Path(os.getenv("PITCHSENSE_DATA_DIR", Path(__file__).resolve().parents[2] / "data"))
+CACHE_DIR = Path(os.getenv("PITCHSENSE_CACHE_DIR", DATA_DIR / ".cache"))
+
+VC_CLEAN_COLUMNS = {
+    "Fund_Focus_Clean": "Fund Focus (Sectors)",
+    "Location_Clean": "Location",
+    "Fund_Stage_Clean": "Fund Stage",
+    "Investor_Name_Clean": "Investor Name",
+}
+
+# Source CSV and precleaned (lower-cased, stripped) columns for every dataset in data/;
+# "taxonomy" tables also get Stage_Mask, Sector_Mask and Sector_Primary (see taxonomy.py)
+TABLES: Dict[str, Dict[str, Any]] = {
+    "vc": {
+        "source": "VC_FundStage_Location_Sector.csv",
+        "clean": VC_CLEAN_COLUMNS,
+        "taxonomy": True,
+    },
+    "vc22": {
+        "source": "vc22.csv",
+        "clean": VC_CLEAN_COLUMNS,
+        "taxonomy": True,
+    },
+    "startup": {
+        "source": "Startup Insights (2012-2021) Copy export 2025-05-23 23-37-23.csv",
+        "clean": {
+            "Company_Clean": "Company",
+            "Country_Clean": "Country",
+            "City_Clean": "City",
+            "Industry_Clean": "Industry",
+            "Investors_Clean": "Select Investors",
+        },
+    },
+}
+
+
+class TableView:
+    """
+    Read-only, memory-mapped view of one published generation of a dataset.
+
+    Columns are np.memmap arrays over the cache files, so every worker process that
+    attaches the same generation shares the same physical pages through the OS page
+    cache instead of holding its own copy. Text columns never contain NaN; missing
+    values read as "" (use `is_null` to tell them apart).
+    """
+
+    def __init__(self, name: str, generation: str, manifest: Dict[str, Any]):
+        self.name = name
+        self.generation = generation
+        self.manifest = manifest
+        self._columns: Dict[str, np.ndarray] = {}
+        self._nulls: Dict[str, np.ndarray] = {}
+        gen_dir = CACHE_DIR / name / generation
+        for entry in manifest["columns"]:
+            self._columns[entry["name"]] = np.load(gen_dir / entry["file"], mmap_mode="r")
+            if "nulls" in entry:
+                self._nulls[entry["name"]] = np.load(gen_dir / entry["nulls"], mmap_mode="r")
+        self._frame: Optional["pd.DataFrame"] = None
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._columns[column]
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def is_null(self, column: str) -> np.ndarray:
+        """Boolean mask of rows that were missing in the source CSV."""
+        if column in self._nulls:
+            return self._nulls[column]
+        return np.zeros(len(self), dtype=bool)
+
+    def rows(self, columns: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate rows as plain dicts without materializing a DataFrame."""
+        names = columns or self.columns
+        for values in zip(*(self._columns[c] for c in names)):
+            yield {c: v.item() for c, v in zip(names, values)}
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        Materialize a pandas DataFrame (private to this process, built once per view).
+
+        Prefer the column arrays where possible; pandas copies text columns into objects.
+        """
+        if self._frame is None:
+            import pandas as pd
+
+            data = {}
+            for column, values in self._columns.items():
+                if values.dtype.kind == "U":
+                    series = pd.Series(values.astype(object))
+                    if column in self._nulls:
+                        series = series.mask(np.asarray(self._nulls[column]))
+                else:
+                    series = pd.Series(np.asarray(values))
+                data[column] = series
+            self._frame = pd.DataFrame(data)
+        return self._frame
+
+
+# Attached views per table, swapped whenever the published generation changes
+_views: Dict[str, TableView] = {}
+_pointer_stamp: Dict[str, int] = {}
+
+
+def file_checksum(path: Path) -> str:
+    """Return the sha256 hex digest of a file, read in 1MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def clean_text(series: "pd.Series") -> "pd.Series":
+    """Apply the same normalization the matchers rely on: no NaN, lower-case, stripped."""
+    return series.fillna("").astype(str).str.lower().str.strip()
+
+
+def clean_value(value: Any) -> str:
+    """Scalar twin of clean_text, for records that do not come from a CSV."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).lower().strip()
+
+
+def derive_record(name: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the precleaned and taxonomy columns of a table to one raw source record.
+
+    Produces exactly the columns _parse_source adds when compiling the CSV, so ingested
+    rows and compiled rows can be mixed freely.
+    """
+    row = dict(record)
+    for clean_col, source_col in TABLES[name]["clean"].items():
+        row[clean_col] = clean_value(record.get(source_col))
+    if TABLES[name].get("taxonomy"):
+        sector = primary_sector(row["Fund_Focus_Clean"])
+        row["Stage_Mask"] = stage_mask(row["Fund_Stage_Clean"])
+        row["Sector_Mask"] = sector_mask(row["Fund_Focus_Clean"])
+        row["Sector_Primary"] = -1 if sector is None else sector
+    return row
+
+
+def _source_path(name: str) -> Path:
+    if name not in TABLES:
+        raise ValueError(f"Unknown dataset: {name}")
+    return DATA_DIR / TABLES[name]["source"]
+
+
+def _generation_name(checksum: str) -> str:
+    return f"v{CACHE_FORMAT_VERSION}.{TAXONOMY_VERSION}-{checksum[:16]}"
+
+
+def _pointer_path(name: str) -> Path:
+    return CACHE_DIR / name / "CURRENT"
+
+
+@contextmanager
+def _build_lock(name: str):
+    """Serialize builds of one table across processes (first worker builds, others wait)."""
+    table_dir = CACHE_DIR / name
+    table_dir.mkdir(parents=True, exist_ok=True)
+    with open(table_dir / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _parse_source(name: str) -> "pd.DataFrame":
+    """Parse the source CSV and add the precleaned columns."""
+    # pandas is only needed when (re)building, so keep it off the import path
+    import pandas as pd
+
+    df = pd.read_csv(_source_path(name))
+    for clean_col, source_col in TABLES[name]["clean"].items():
+        df[clean_col] = clean_text(df[source_col])
+    if TABLES[name].get("taxonomy"):
+        df["Stage_Mask"] = df["Fund_Stage_Clean"].map(stage_mask).astype("int64")
+        df["Sector_Mask"] = df["Fund_Focus_Clean"].map(sector_mask).astype("int64")
+        df["Sector_Primary"] = df["Fund_Focus_Clean"].map(
+            lambda focus: -1 if primary_sector(focus) is None else primary_sector(focus)
+        ).astype("int64")
+    if name == "startup":
+        df["Valuation_B"] = pd.to_numeric(
+            df["Valuation ($B)"].astype(str).str.replace(r"[$,]", "", regex=True), errors="coerce"
+        )
+    return df
+
+
+def _read_manifest(name: str, generation: str) -> Optional[Dict[str, Any]]:
+    path = CACHE_DIR / name / generation / "manifest.json"
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _published_generation(name: str) -> Optional[str]:
+    try:
+        return _pointer_path(name).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _is_fresh(name: str, manifest: Dict[str, Any]) -> bool:
+    """Whether a build still matches its source CSV (cheap size/mtime check, then checksum)."""
+    stat = _source_path(name).stat()
+    if (manifest["format_version"] != CACHE_FORMAT_VERSION
+            or manifest.get("taxonomy_version") != TAXONOMY_VERSION
+            or manifest["source_size"] != stat.st_size):
+        return False
+    if manifest["source_mtime_ns"] == stat.st_mtime_ns:
+        return True
+    return manifest["source_sha256"] == file_checksum(_source_path(name))
+
+
+def _write_generation(name: str, checksum: str) -> Dict[str, Any]:
+    """
+    Compile a source CSV into a new generation directory and return its manifest.
+
+    Every column is written as its own .npy file: text columns as fixed-width unicode
+    arrays (with a null mask when the source had missing values) and numeric columns
+    as-is, so all of them can be memory-mapped on load.
+    """
+    import pandas as pd
+
+    source = _source_path(name)
+    target = CACHE_DIR / name / _generation_name(checksum)
+    df = _parse_source(name)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        kind = "numeric" if pd.api.types.is_numeric_dtype(series) else "text"
+        entry = {"name": col, "file": f"col{i}.npy", "kind": kind}
+        if entry["kind"] == "text":
+            nulls = series.isna().to_numpy()
+            np.save(tmp / entry["file"], series.fillna("").astype(str).to_numpy(dtype=str))
+            if nulls.any():
+                entry["nulls"] = f"col{i}.nulls.npy"
+                np.save(tmp / entry["nulls"], nulls)
+        else:
+            np.save(tmp / entry["file"], series.to_numpy())
+        columns.append(entry)
+
+    manifest = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "taxonomy_version": TAXONOMY_VERSION,
+        "table": name,
+        "source": source.name,
+        "source_sha256": checksum,
+        "source_size": source.stat().st_size,
+        "source_mtime_ns": source.stat().st_mtime_ns,
+        "rows": len(df),
+        "columns": columns,
+    }
+    with open(tmp / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return manifest
+
+
+def _publish(name: str, generation: str):
+    """Atomically point CURRENT at a generation and prune everything older than the previous one."""
+    previous = _published_generation(name)
+    pointer = _pointer_path(name)
+    tmp = pointer.with_name(f"CURRENT.tmp-{os.getpid()}")
+    tmp.write_text(generation)
+    os.replace(tmp, pointer)
+
+    # Workers may still have the previous generation mapped; unlinking older ones is safe
+    # because an mmap keeps its inode alive until the last mapping goes away.
+    keep = {generation, previous, "CURRENT", ".lock"}
+    for entry in (CACHE_DIR / name).iterdir():
+        if entry.name not in keep and ".tmp-" not in entry.name:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def build_table(name: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Make sure the published generation of a table matches its source CSV and return its manifest.
+
+    Generations are keyed by cache format version and source checksum. The CSV is only
+    re-parsed when that key changes (or `force` is set); publishing swaps the CURRENT
+    pointer atomically, so readers see either the old or the new generation, never a mix.
+    """
+    with _build_lock(name):
+        generation = _published_generation(name)
+        manifest = _read_manifest(name, generation) if generation else None
+        if manifest and not force and _is_fresh(name, manifest):
+            return manifest
+
+        checksum = file_checksum(_source_path(name))
+        generation = _generation_name(checksum)
+        manifest = None if force else _read_manifest(name, generation)
+        if manifest is None:
+            manifest = _write_generation(name, checksum)
+        _publish(name, generation)
+        return manifest
+
+
+def prepare_tables(names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Build and publish every table once, before workers start attaching.
+
+    Run this in the parent process (or as a deploy step via scripts/build_datasets.py)
+    so `uvicorn --workers N` workers only ever attach read-only views.
+    """
+    return {name: build_table(name) for name in (names or list(TABLES))}
+
+
+def attach_table(name: str) -> TableView:
+    """
+    Return a zero-copy view of the currently published generation of a table.
+
+    The view is re-attached whenever the CURRENT pointer changes, so a reload done by
+    any process is picked up on the next call. If nothing was published yet, the table
+    is built first.
+    """
+    pointer = _pointer_path(name)
+    try:
+        stamp = pointer.stat().st_mtime_ns
+    except FileNotFoundError:
+        build_table(name)
+        stamp = pointer.stat().st_mtime_ns
+
+    view = _views.get(name)
+    if view is None or _pointer_stamp.get(name) != stamp:
+        generation = _published_generation(name)
+        if view is None or view.generation != generation:
+            manifest = _read_manifest(name, generation)
+            if manifest is None:
+                manifest = build_table(name)
+                generation = _published_generation(name)
+            view = TableView(name, generation, manifest)
+            _views[name] = view
+        _pointer_stamp[name] = stamp
+    return view
+
+
+def reload_table(name: str, force: bool = False) -> TableView:
+    """Rebuild a table if its source changed, publish the new generation and attach it."""
+    build_table(name, force=force)
+    return attach_table(name)
+
+
+def load_table(name: str) -> "pd.DataFrame":
+    """
+    Return the cleaned DataFrame for a dataset, loading it from the columnar cache.
+
+    The frame is memoized per generation and shared by all callers in this process, so
+    it must be treated as read-only. Hot paths should use `attach_table` instead, which
+    shares memory across worker processes.
+    """
+    return attach_table(name).to_frame()
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Whole-request time budget when the client does not send X-Request-Timeout
+DEFAULT_REQUEST_SECONDS = float(os.getenv("PITCHSENSE_REQUEST_TIMEOUT_SECONDS", "120"))
+MAX_REQUEST_SECONDS = float(os.getenv("PITCHSENSE_MAX_REQUEST_TIMEOUT_SECONDS", "600"))
+
+# A provider call is not started with less time than this left: it could not finish anyway
+MIN_CALL_SECONDS = 1.0
+
+# How often a thread blocked on other work looks at its own request's cancellation flag
+CANCEL_POLL_SECONDS = 0.25
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request (or the current stage's share of it) ran out of time."""
+
+
+class RequestCancelled(DeadlineExceeded):
+    """The client went away; the rest of the request's work is abandoned."""
+
+
+class Deadline:
+    """
+    Point in time by which some work must finish, plus a cancellation flag.
+
+    Child deadlines (one per pipeline stage) end no later than their parent and share its
+    cancellation flag, so cancelling a request stops every stage and every worker thread
+    running on its behalf.
+    """
+
+    def __init__(self, seconds: float, name: str = "request", parent: Optional["Deadline"] = None):
+        self.name = name
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._root = parent._root if parent is not None else self
+        self._cancelled = parent._cancelled if parent is not None else threading.Event()
+        self.reason: Optional[str] = None
+
+    def child(self, seconds: float, name: str) -> "Deadline":
+        return Deadline(seconds, name=name, parent=self)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        self._root.reason = reason
+        self._cancelled.set()
+
+    def check(self):
+        """Raise RequestCancelled / DeadlineExceeded if the work should stop now."""
+        if self._cancelled.is_set():
+            raise RequestCancelled(f"Request cancelled: {self._root.reason}")
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded ({self.name})")
+
+    def timeout(self) -> float:
+        """Seconds the next provider call may take; raises if there is not enough left to start one."""
+        self.check()
+        remaining = self.remaining()
+        if remaining < MIN_CALL_SECONDS:
+            raise DeadlineExceeded(f"Deadline exceeded ({self.name}): {remaining:.2f}s left")
+        return remaining
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """Run the block (and bind_context tasks it spawns) under `deadline`; None lifts any deadline."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline():
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def has_time(seconds: float) -> bool:
+    """Whether at least `seconds` are left (always true outside a deadline)."""
+    deadline = _current.get()
+    return deadline is None or (not deadline.cancelled and deadline.remaining() >= seconds)
+
+
+def call_timeout() -> Optional[float]:
+    """Timeout for the next provider call under the current deadline, or None without one."""
+    deadline = _current.get()
+    return deadline.timeout() if deadline is not None else None
+
+
+def wait_event(event: threading.Event):
+    """Block until `event` is set, or raise once the current deadline expires or is cancelled."""
+    deadline = _current.get()
+    if deadline is None:
+        event.wait()
+        return
+    while not event.wait(min(CANCEL_POLL_SECONDS, deadline.remaining())):
+        deadline.check()
+
+
+def wait_future(future: Future) -> Any:
+    """future.result(), giving up (DeadlineExceeded / RequestCancelled) when the current deadline says stop."""
+    deadline = _current.get()
+    if deadline is not None:
+        while not wait([future], timeout=min(CANCEL_POLL_SECONDS, deadline.remaining())).done:
+            deadline.check()
+    return future.result()
+
+
+def detached(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap background work that must outlive the request that started it (no deadline, no cancellation)."""
+    @wraps(fn)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with deadline_scope(None):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+def until_deadline(chunks: Iterator[str], deadline: Optional[Deadline]) -> Iterator[str]:
+    """Pass a provider stream through, closing it (which stops generation) once the deadline says stop."""
+    try:
+        # Also checked before the first chunk: the provider request is only sent then
+        if deadline is not None:
+            deadline.check()
+        for chunk in chunks:
+            if deadline is not None:
+                deadline.check()
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class StageBudget:
+    """
+    Splits the current deadline across the stages of a pipeline by weight.
+
+    A stage's share is taken from the time remaining when it starts, divided among the
+    stages not yet run, so time an early stage leaves unused flows to the later ones.
+    Bounded stages are held to their share; unbounded (required) stages may run on until
+    the request deadline, since the request cannot succeed without them.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = dict(weights)
+        self._pending = dict(weights)
+
+    def share(self, name: str) -> Optional[float]:
+        """Seconds the stage would get if it started now (None outside a deadline)."""
+        deadline = _current.get()
+        if deadline is None:
+            return None
+        total = sum(self._pending.values()) or 1.0
+        return deadline.remaining() * self._pending.get(name, self.weights.get(name, 0.0)) / total
+
+    @contextmanager
+    def stage(self, name: str, bounded: bool = True):
+        parent = _current.get()
+        seconds = self.share(name)
+        self._pending.pop(name, None)
+        if parent is None:
+            yield None
+            return
+        with deadline_scope(parent.child(seconds if bounded else parent.remaining(), name)) as deadline:
+            yield deadline
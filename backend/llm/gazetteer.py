@@ -0,0 +1,347 @@
+import csv
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .datasets import DATA_DIR
+
+# Bundled offline gazetteer: cities, states, countries and regions with canonical ids,
+# aliases, a parent link and coordinates. Free-text locations ('Cambridge, MA', 'Bangalore,
+# India', 'Austin, San Francisco') resolve to places, and VC offices are scored against a
+# startup by distance and shared ancestry instead of substring scans over the raw text.
+
+GAZETTEER_PATH = Path(os.getenv("PITCHSENSE_GAZETTEER", DATA_DIR / "gazetteer.csv"))
+
+# Place kinds from coarsest to most specific; a place's parent is always coarser
+KINDS = ["region", "country", "state", "city"]
+
+# Offices within this distance of the startup's city count as the same metro area
+# (Palo Alto, Menlo Park and San Jose are all 'San Francisco' for matching purposes)
+METRO_KM = 80.0
+EARTH_RADIUS_KM = 6371.0
+
+# Location match tiers, best last: the deepest level of the hierarchy a VC office shares
+# with the startup
+TIER_NONE, TIER_REGION, TIER_COUNTRY, TIER_STATE, TIER_METRO = range(5)
+
+_SPLIT = re.compile(r"\s*(?:[,;/]|\band\b|&)\s*")
+
+
+def _normalize(text) -> str:
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    return " ".join(str(text).lower().split())
+
+
+def to_xyz(lat, lon) -> np.ndarray:
+    """Unit-sphere coordinates; chord distance between them is monotonic in great-circle distance."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_for_km(km: float) -> float:
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def km_for_chord(chord) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class KDTree:
+    """
+    Static k-d tree over 3-d unit-sphere points, answering radius queries in km.
+
+    Built once per point set by median splits on the widest axis; leaves are scanned with
+    one vectorized distance computation each.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 16):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.leaf_size = leaf_size
+        self._root = self._build(np.arange(len(self.points)))
+
+    def _build(self, indices: np.ndarray):
+        if len(indices) <= self.leaf_size:
+            return (indices,)
+        points = self.points[indices]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        ordered = indices[np.argsort(points[:, axis], kind="stable")]
+        middle = len(ordered) // 2
+        split = self.points[ordered[middle], axis]
+        # Left holds coordinates <= split, right >= split
+        return (axis, split, self._build(ordered[:middle]), self._build(ordered[middle:]))
+
+    def query_radius(self, point: np.ndarray, km: float) -> np.ndarray:
+        """Indices of every point within `km` of `point` (unordered)."""
+        radius = chord_for_km(km)
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if len(node) == 1:
+                indices = node[0]
+                if len(indices):
+                    distances = np.linalg.norm(self.points[indices] - point, axis=1)
+                    found.append(indices[distances <= radius])
+                continue
+            axis, split, left, right = node
+            if point[axis] - radius <= split:
+                stack.append(left)
+            if point[axis] + radius >= split:
+                stack.append(right)
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+class Gazetteer:
+    """Places loaded from the bundled CSV, with an alias index and a spatial index over cities."""
+
+    def __init__(self, path: Path = GAZETTEER_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+        self.ids: List[str] = [row["id"] for row in rows]
+        self.names: List[str] = [row["name"] for row in rows]
+        self.kinds = np.array([KINDS.index(row["kind"]) for row in rows], dtype=np.int8)
+        self._index: Dict[str, int] = {place_id: index for index, place_id in enumerate(self.ids)}
+        parents = [self._index[row["parent"]] if row["parent"] else -1 for row in rows]
+
+        # levels[i, k]: the ancestor (or the place itself) of kind KINDS[k], -1 when none
+        self.levels = np.full((len(rows), len(KINDS)), -1, dtype=np.int64)
+        for index in range(len(rows)):
+            node = index
+            while node >= 0:
+                self.levels[index, self.kinds[node]] = node
+                node = parents[node]
+
+        self.xyz = to_xyz(np.array([float(row["lat"]) for row in rows]), np.array([float(row["lon"]) for row in rows]))
+        self.cities = np.flatnonzero(self.kinds == KINDS.index("city"))
+        self.city_tree = KDTree(self.xyz[self.cities])
+
+        self._aliases: Dict[str, List[int]] = {}
+        for index, row in enumerate(rows):
+            for alias in [row["name"], *row["aliases"].split("|")]:
+                alias = _normalize(alias)
+                if alias and index not in self._aliases.setdefault(alias, []):
+                    self._aliases[alias].append(index)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_of(self, place_id: str) -> Optional[int]:
+        return self._index.get(place_id)
+
+    def kind(self, index: int) -> str:
+        return KINDS[self.kinds[index]]
+
+    def is_within(self, index: int, ancestor: int) -> bool:
+        return self.levels[index, self.kinds[ancestor]] == ancestor
+
+    def resolve(self, text) -> Tuple[int, ...]:
+        """
+        Places named in a free-text location, most specific only, in order of mention.
+
+        'Cambridge, MA' is one place (the part 'MA' disambiguates Cambridge and is then
+        dropped as its ancestor); 'San Francisco, Brazil, India' is three. A state or country
+        right after a place qualifies it unless the text lists several countries: when no
+        reading lies within the qualifier ('Paris, TX', a Paris we do not know), the place
+        is dropped and only the qualifier kept. Unknown parts are ignored.
+        """
+        parts = [part for part in _SPLIT.split(_normalize(text)) if part]
+        candidates = [self._aliases.get(part, []) for part in parts]
+        country = KINDS.index("country")
+        listed_countries = sum(any(self.kinds[o] == country for o in options) for options in candidates)
+
+        chosen: List[int] = []
+        for position, options in enumerate(candidates):
+            if not options:
+                continue
+            others = [c for other, group in enumerate(candidates) if other != position for c in group]
+            related = [o for o in options if any(self.is_within(o, c) or self.is_within(c, o) for c in others)]
+            qualifiers = [
+                q for q in (candidates[position + 1] if position + 1 < len(candidates) else ())
+                if self.kind(q) == "state" or (self.kinds[q] == country and listed_countries == 1)
+            ]
+            if not related and any(all(self.kinds[o] > self.kinds[q] for o in options) for q in qualifiers):
+                # A different place of the same name; the qualifier alone is what we know
+                continue
+            # Prefer the reading the rest of the text supports, then the most specific one
+            pool = related or options
+            best = max(pool, key=lambda o: (self.kinds[o], -pool.index(o)))
+            if best not in chosen:
+                chosen.append(best)
+        return tuple(p for p in chosen if not any(q != p and self.is_within(q, p) for q in chosen))
+
+    def cities_near(self, index: int, km: float = METRO_KM) -> List[Tuple[int, float]]:
+        """(city, distance km) pairs within `km` of a place, nearest first."""
+        hits = self.cities[self.city_tree.query_radius(self.xyz[index], km)]
+        distances = km_for_chord(np.linalg.norm(self.xyz[hits] - self.xyz[index], axis=1))
+        order = np.argsort(distances, kind="stable")
+        return [(int(hits[i]), float(distances[i])) for i in order]
+
+    def lineage(self, index: int) -> List[int]:
+        """The place and its ancestors, most specific first."""
+        return [int(p) for p in self.levels[index, ::-1] if p >= 0]
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
+
+
+@lru_cache(maxsize=8192)
+def resolve(text: str) -> Tuple[int, ...]:
+    """Gazetteer indices of the places in a free-text location (cached per distinct string)."""
+    return get_gazetteer().resolve(text)
+
+
+def specificity(place: int) -> int:
+    """The match tier an office needs to count as 'in' this place (a city needs the same metro)."""
+    return int(get_gazetteer().kinds[place]) + 1
+
+
+def place_chain(text: str) -> List[str]:
+    """
+    Ids to try, in order, when looking up a per-place value for a location: the place itself,
+    cities in its metro area by distance, then its state, country and region.
+    """
+    gazetteer = get_gazetteer()
+    places = resolve(text)
+    if not places:
+        return []
+    place = places[0]
+    chain = [place]
+    if gazetteer.kind(place) == "city":
+        chain += [city for city, _ in gazetteer.cities_near(place)]
+    chain += gazetteer.lineage(place)
+    seen = set()
+    return [gazetteer.ids[p] for p in chain if not (p in seen or seen.add(p))]
+
+
+class LocationIndex:
+    """
+    Offices of every investor in one table generation, resolved once.
+
+    Each investor may list several offices; each office carries its region/country/state
+    ancestry and, for cities, a point in a k-d tree. Scoring a startup against the whole
+    table is then a few array comparisons plus one radius query.
+    """
+
+    def __init__(self, locations: Iterable[str], generation: str):
+        gazetteer = get_gazetteer()
+        owners: List[int] = []
+        places: List[int] = []
+        size = 0
+        for row, text in enumerate(locations):
+            size = row + 1
+            for place in resolve(text):
+                owners.append(row)
+                places.append(place)
+        self.generation = generation
+        self.size = size
+        self.owners = np.array(owners, dtype=np.int64)
+        self.places = np.array(places, dtype=np.int64)
+        self.levels = gazetteer.levels[self.places] if places else np.empty((0, len(KINDS)), dtype=np.int64)
+        is_city = gazetteer.kinds[self.places] == KINDS.index("city") if places else np.empty(0, dtype=bool)
+        self._city_offices = np.flatnonzero(is_city)
+        self._tree = KDTree(gazetteer.xyz[self.places[self._city_offices]])
+
+    def tiers(self, places: Iterable[int]) -> np.ndarray:
+        """Best match tier of each investor (row order) against the startup's places."""
+        gazetteer = get_gazetteer()
+        best = np.zeros(self.size, dtype=np.int8)
+        for place in places:
+            office = np.zeros(len(self.owners), dtype=np.int8)
+            for level, tier in ((0, TIER_REGION), (1, TIER_COUNTRY), (2, TIER_STATE)):
+                ancestor = gazetteer.levels[place, level]
+                if ancestor >= 0:
+                    office[self.levels[:, level] == ancestor] = tier
+            if gazetteer.kind(place) == "city":
+                nearby = self._tree.query_radius(gazetteer.xyz[place], METRO_KM)
+                office[self._city_offices[nearby]] = TIER_METRO
+            np.maximum.at(best, self.owners, office)
+        return best
+
+
+class LiveLocationIndex:
+    """
+    Location tiers for a live investor snapshot: the base table's index plus one over its changes.
+
+    The base index is built once per compiled table generation; an ingestion only rebuilds
+    the small index over the changed records. Tiers are merged into snapshot row order:
+    base rows (minus deleted, with updated ones taken from the changes), then added records.
+    """
+
+    def __init__(self, base: LocationIndex, base_rows: Dict[str, List[int]], delta: Dict[str, Dict],
+                 tombstones: Iterable[str], generation: str):
+        self.generation = generation
+        self.base = base
+        self.changes = LocationIndex((row["Location"] for row in delta.values()), generation)
+        keep = np.ones(base.size, dtype=bool)
+        for key in tombstones:
+            keep[base_rows.get(key, [])] = False
+        replaced, replaced_from, added = [], [], []
+        for position, key in enumerate(delta):
+            rows = base_rows.get(key)
+            if rows:
+                replaced += rows
+                replaced_from += [position] * len(rows)
+            else:
+                added.append(position)
+        self._keep = keep
+        self._replaced = np.array(replaced, dtype=np.int64)
+        self._replaced_from = np.array(replaced_from, dtype=np.int64)
+        self._added = np.array(added, dtype=np.int64)
+        self.size = int(keep.sum()) + len(added)
+
+    def tiers(self, places: Iterable[int]) -> np.ndarray:
+        places = list(places)
+        best = self.base.tiers(places)
+        changed = self.changes.tiers(places)
+        best[self._replaced] = changed[self._replaced_from]
+        return np.concatenate([best[self._keep], changed[self._added]])
+
+
+_location_index = None
+_base_location_index: Optional[Tuple[LocationIndex, Dict[str, List[int]]]] = None
+_location_index_lock = threading.Lock()
+
+
+def _base_index(base) -> Tuple[LocationIndex, Dict[str, List[int]]]:
+    """LocationIndex of a compiled table and its row positions by investor key (lock held)."""
+    global _base_location_index
+    if _base_location_index is None or _base_location_index[0].generation != base.generation:
+        rows: Dict[str, List[int]] = {}
+        for position, key in enumerate(base["Investor_Name_Clean"]):
+            rows.setdefault(str(key), []).append(position)
+        _base_location_index = (LocationIndex((row["Location"] for row in base.rows()), base.generation), rows)
+    return _base_location_index
+
+
+def location_index(table):
+    """
+    The location index of a table snapshot, rebuilt only when its generation changes.
+
+    For a live investor snapshot (one with a compiled `base` and `changes()`), only the
+    index over ingested changes is rebuilt per generation; the base index is reused.
+    """
+    global _location_index
+    with _location_index_lock:
+        if _location_index is None or _location_index.generation != table.generation:
+            if hasattr(table, "changes"):
+                base, base_rows = _base_index(table.base)
+                delta, tombstones = table.changes()
+                _location_index = LiveLocationIndex(base, base_rows, delta, tombstones, table.generation)
+            else:
+                _location_index = LocationIndex((row["Location"] for row in table.rows()), table.generation)
+        return _location_index
@@ -1,19 +1,29 @@
-import json
-import re
-from typing import Dict, Any, Optional
-from .llm_router import route_llm_call
+from typing import Dict, Any, Iterator, Optional
+from .llm_router import route_llm_call, route_llm_json, route_llm_stream
 from .confidence_scorer import analyze_pitch_confidence
 from .clarifier import get_clarifying_questions_for_pitch
+from .prompts import PromptTemplate, register_template
 
-def generate_pitch_json(startup_name: str, industry: str, product: str, traction: str, ask: str, stage: str,
-                       investor_name: str = "", investor_focus: Optional[str] = None) -> Dict[str, Any]:
-    """Generate a JSON-formatted investor pitch tailored for VC audiences."""
-    # Construct investor context
-    investor_info = f"Investor Name: {investor_name}" + (f", Focus: {investor_focus}" if investor_focus else "")
+PITCH_SECTIONS = ["problem", "solution", "market", "business_model", "competition", "traction", "ask"]
 
-    prompt = f"""
-You are a world-class startup storyteller advising a founder preparing to pitch top-tier VCs, specifically {investor_name}.
-{investor_info}
+# Structured-output schema for generate_pitch_json: one {text, confidence} object per section
+PITCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        section: {
+            "type": "object",
+            "properties": {"text": {"type": "string"}, "confidence": {"type": "number"}},
+            "required": ["text", "confidence"]
+        }
+        for section in PITCH_SECTIONS
+    },
+    "required": PITCH_SECTIONS
+}
+
+PITCH_TEMPLATE = register_template(PromptTemplate(
+    name="pitch_json",
+    version="2",
+    prefix="""You are a world-class startup storyteller advising a founder preparing to pitch top-tier VCs.
 
 Craft a concise yet comprehensive 7-part investor pitch that covers:
 1. Problem — Vivid story + quantified pain (e.g., hours lost, dollars wasted).
@@ -25,16 +35,20 @@ Craft a concise yet comprehensive 7-part investor pitch that covers:
 7. Ask & Use of Funds — Funding amount, valuation context, deployment plan with KPIs.
 
 Ensure each section includes at least one quantitative metric, timeframe, or specific benchmark.
+Tailor the pitch to the investor named below.
 Output only valid JSON in this format:
-{{
-  "problem": {{"text": "...", "confidence": 0.91}},
-  "solution": {{"text": "...", "confidence": 0.89}},
-  "market": {{"text": "...", "confidence": 0.86}},
-  "business_model": {{"text": "...", "confidence": 0.88}},
-  "competition": {{"text": "...", "confidence": 0.85}},
-  "traction": {{"text": "...", "confidence": 0.93}},
-  "ask": {{"text": "...", "confidence": 0.92}}  
-}}
+{
+  "problem": {"text": "...", "confidence": 0.91},
+  "solution": {"text": "...", "confidence": 0.89},
+  "market": {"text": "...", "confidence": 0.86},
+  "business_model": {"text": "...", "confidence": 0.88},
+  "competition": {"text": "...", "confidence": 0.85},
+  "traction": {"text": "...", "confidence": 0.93},
+  "ask": {"text": "...", "confidence": 0.92}
+}
+""",
+    suffix="""
+{investor_info}
 
 Startup Name: {startup_name}
 Industry: {industry}
@@ -43,22 +57,60 @@ Traction: {traction}
 Stage: {stage}
 Funding Ask: {ask}
 """
+))
 
-    # Call the LLM
-    raw_content = route_llm_call(
+EMAIL_TEMPLATE = register_template(PromptTemplate(
+    name="generate_email",
+    version="3",
+    prefix="""Generate a concise, single-paragraph cold email to a VC investor. Follow this structure exactly:
+1. Subject line
+2. One-line greeting
+3. One paragraph combining key metrics and ask (max 3 sentences)
+4. One-line call to action
+5. Standard signature block
+
+Avoid any repetition in the content. Each piece of information should appear exactly once.
+Where the investor's focus, stage or location is given, connect the startup to it in one clause.
+
+Use these details:
+""",
+    suffix="""- Startup: {startup_name}
+- Investor: {investor_name}{investor_details}
+- Traction: {traction_summary}
+- Ask: {ask_summary}
+- Your Name: {your_name}
+- Your Email: {your_email}"""
+))
+
+def generate_pitch_json(startup_name: str, industry: str, product: str, traction: str, ask: str, stage: str,
+                       investor_name: str = "", investor_focus: Optional[str] = None) -> Dict[str, Any]:
+    """Generate a JSON-formatted investor pitch tailored for VC audiences."""
+    # Construct investor context
+    investor_info = f"Investor Name: {investor_name}" + (f", Focus: {investor_focus}" if investor_focus else "")
+
+    prompt = PITCH_TEMPLATE.render(
+        investor_info=investor_info,
+        startup_name=startup_name,
+        industry=industry,
+        product=product,
+        traction=traction,
+        stage=stage,
+        ask=ask
+    )
+
+    # Call the LLM in structured-output mode; malformed JSON is repaired locally, not regenerated
+    raw_pitch = route_llm_json(
         task_type='pitch_block',
         prompt=prompt,
+        schema=PITCH_SCHEMA,
+        name='investor_pitch',
         max_tokens=1200
     )
-
-    # Clean and parse the response
-    if not raw_content.strip():
+    if not isinstance(raw_pitch, dict) or not raw_pitch:
         raise ValueError("Empty response from LLM in generate_pitch")
-    raw_content = re.sub(r"^```(?:json)?\s*", "", raw_content)
-    raw_content = re.sub(r"\s*```$", "", raw_content)
 
-    # Parse JSON and analyze confidence
-    raw_pitch = json.loads(raw_content)
+    # Keep only well-formed sections and analyze confidence
+    raw_pitch = {k: v for k, v in raw_pitch.items() if isinstance(v, dict) and isinstance(v.get("text"), str)}
     user_inputs = [startup_name, industry, product, traction, stage, ask]
     analyzed_pitch = analyze_pitch_confidence(raw_pitch, user_inputs)
     return analyzed_pitch
@@ -67,29 +119,31 @@ def generate_clarifying_questions(pitch_json: Dict[str, Any]) -> Dict[str, Any]:
     """Generate clarifying questions for sections with low confidence."""
     return get_clarifying_questions_for_pitch(pitch_json)
 
-def generate_email(pitch_json: Dict[str, Any], investor_name: str = "Alex", 
-                  your_name: str = "Lily Zhang", startup_name: str = "FlowPay", 
-                  your_email: str = "you@example.com") -> str:
-    """Generate a cold email to an investor based on the pitch."""
-    traction_summary = pitch_json.get("traction", {}).get("text", "")
-    ask_summary = pitch_json.get("ask", {}).get("text", "")
+def build_email_context(pitch_json: Dict[str, Any], your_name: str = "Lily Zhang",
+                        startup_name: str = "FlowPay", your_email: str = "you@example.com") -> Dict[str, str]:
+    """Extract the pitch and sender details every outreach email to any investor shares."""
+    return {
+        "startup_name": startup_name,
+        "traction_summary": pitch_json.get("traction", {}).get("text", ""),
+        "ask_summary": pitch_json.get("ask", {}).get("text", ""),
+        "your_name": your_name,
+        "your_email": your_email
+    }
 
-    prompt = f"""Generate a concise, single-paragraph cold email to a VC investor. Follow this structure exactly:
-1. Subject line
-2. One-line greeting
-3. One paragraph combining key metrics and ask (max 3 sentences)
-4. One-line call to action
-5. Standard signature block
+# Investor record fields that personalize an email, with their prompt labels
+INVESTOR_DETAILS = [("focus", "Investor focus"), ("stage", "Investor stage"), ("location", "Investor location")]
 
-Use these details:
-- Startup: {startup_name}
-- Investor: {investor_name}
-- Traction: {traction_summary}
-- Ask: {ask_summary}
-- Your Name: {your_name}
-- Your Email: {your_email}
+def render_email_prompt(context: Dict[str, str], investor: Dict[str, Any]):
+    """The email prompt for one investor record (name plus whatever focus, stage and location it has)."""
+    details = "".join(
+        f"\n- {label}: {str(investor[field]).strip()}"
+        for field, label in INVESTOR_DETAILS if str(investor.get(field) or "").strip()
+    )
+    return EMAIL_TEMPLATE.render(investor_name=investor.get("name", ""), investor_details=details, **context)
 
-Avoid any repetition in the content. Each piece of information should appear exactly once."""
+def generate_email_from_context(context: Dict[str, str], investor: Dict[str, Any]) -> str:
+    """Generate a cold email to one investor record from a prebuilt email context."""
+    prompt = render_email_prompt(context, investor)
 
     email_content = route_llm_call(
         task_type='generate_email',
@@ -98,3 +152,15 @@ Avoid any repetition in the content. Each piece of information should appear exa
     )
     
     return email_content.strip()
+
+def stream_email_from_context(context: Dict[str, str], investor: Dict[str, Any]) -> Iterator[str]:
+    """Stream a cold email to one investor record, chunk by chunk, from a prebuilt email context."""
+    prompt = render_email_prompt(context, investor)
+    return route_llm_stream(task_type='generate_email', prompt=prompt, max_tokens=300)
+
+def generate_email(pitch_json: Dict[str, Any], investor_name: str = "Alex", 
+                  your_name: str = "Lily Zhang", startup_name: str = "FlowPay", 
+                  your_email: str = "you@example.com", investor: Optional[Dict[str, Any]] = None) -> str:
+    """Generate a cold email to an investor based on the pitch (personalized by `investor`'s record, if given)."""
+    context = build_email_context(pitch_json, your_name=your_name, startup_name=startup_name, your_email=your_email)
+    return generate_email_from_context(context, {**(investor or {}), "name": investor_name})
@@ -1,29 +1,59 @@
 from typing import Dict, Any
 from .confidence_scorer import analyze_pitch_confidence
 from .llm_router import route_llm_call
+from .prompts import PromptTemplate, register_template
 
-def improve_pitch_section(section_name: str, current_text: str, user_input: str) -> Dict[str, Any]:
-    """Improve a specific section of the pitch based on user input."""
-    prompt = f"""You are a world-class startup storyteller helping to improve a pitch for investors.
+IMPROVE_TEMPLATE = register_template(PromptTemplate(
+    name="improve_section",
+    version="2",
+    prefix="""You are a world-class startup storyteller helping to improve a pitch for investors.
 
-I need to improve the '{section_name}' section of my pitch based on additional information.
+I need to improve one section of my pitch based on additional information.
+Please rewrite this section to incorporate the user's input while maintaining a compelling narrative style.
+Focus on making the content specific, credible, and impactful for investors.
+
+Avoid buzzwords, vague claims, and unsubstantiated statements.
+Include concrete details, metrics, and specific examples wherever possible.
+
+Return only the improved text without any explanations or formatting.
+""",
+    suffix="""
+Section: '{section_name}'
 
 Current text:
 "{current_text}"
 
 Additional information from the user:
-"{user_input}"
+"{user_input}\""""
+))
 
-Please rewrite this section to incorporate the user's input while maintaining a compelling narrative style.
-Focus on making the content specific, credible, and impactful for investors.
+REGENERATE_TEMPLATE = register_template(PromptTemplate(
+    name="regenerate_section",
+    version="2",
+    prefix="""You are a world-class startup storyteller helping to improve a pitch for investors.
 
-Avoid buzzwords, vague claims, and unsubstantiated statements.
-Include concrete details, metrics, and specific examples wherever possible.
+I need to completely regenerate one section of my pitch to make it more compelling and specific.
+Please rewrite this section to make it:
+1. More specific with concrete details and metrics
+2. Free of buzzwords and vague claims
+3. Compelling and credible for investors
+4. Structured as a short narrative that builds conviction
 
-Return only the improved text without any explanations or formatting."""
+Return only the improved text without any explanations or formatting.
+""",
+    suffix="""
+Section: '{section_name}'
+
+Current text:
+"{current_text}\""""
+))
+
+def improve_pitch_section(section_name: str, current_text: str, user_input: str) -> Dict[str, Any]:
+    """Improve a specific section of the pitch based on user input."""
+    prompt = IMPROVE_TEMPLATE.render(section_name=section_name, current_text=current_text, user_input=user_input)
     
     # Call LLM for improving the section
-    improved_text = route_llm_call("pitch_block", prompt, max_tokens=500)
+    improved_text = route_llm_call("improve_section", prompt, max_tokens=500)
     
     return {
         "text": improved_text.strip(),
@@ -32,20 +62,7 @@ Return only the improved text without any explanations or formatting."""
 
 def regenerate_pitch_section(section_name: str, current_text: str) -> Dict[str, Any]:
     """Completely regenerate a section of the pitch to improve its quality."""
-    prompt = f"""You are a world-class startup storyteller helping to improve a pitch for investors.
-
-I need to completely regenerate the '{section_name}' section of my pitch to make it more compelling and specific.
-
-Current text:
-"{current_text}"
-
-Please rewrite this section to make it:
-1. More specific with concrete details and metrics
-2. Free of buzzwords and vague claims
-3. Compelling and credible for investors
-4. Structured as a short narrative that builds conviction
-
-Return only the improved text without any explanations or formatting."""
+    prompt = REGENERATE_TEMPLATE.render(section_name=section_name, current_text=current_text)
     
     # Call LLM for regenerating the section
     regenerated_text = route_llm_call("regenerate", prompt, max_tokens=500)
@@ -0,0 +1,308 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from .datasets import DATA_DIR, TableView, attach_table, clean_value, derive_record
+
+INVESTOR_TABLE = "vc"
+INVESTOR_LOG = Path(os.getenv("PITCHSENSE_INVESTOR_LOG", DATA_DIR / "investors.log.ndjson"))
+
+# Source columns of an investor record, by API field name
+FIELDS = {
+    "name": "Investor Name",
+    "stage": "Fund Stage",
+    "focus": "Fund Focus (Sectors)",
+    "location": "Location",
+}
+
+# Rewrite the log once it holds this many more entries than live changes
+COMPACT_MIN_ENTRIES = 1000
+COMPACT_RATIO = 2
+
+
+def investor_key(name: Any) -> str:
+    return clean_value(name)
+
+
+class InvestorSnapshot:
+    """
+    Immutable view of the investor table: the compiled base generation plus ingested changes.
+
+    Updated investors keep their base position and new ones follow the base rows in the
+    order they were first added, so row order (and therefore ranking tie-breaks) is stable.
+    A reader holding a snapshot never sees a later update.
+    """
+
+    def __init__(self, base: TableView, base_keys: Dict[str, int], delta: Dict[str, Dict[str, Any]],
+                 tombstones: FrozenSet[str], version: str):
+        self.base = base
+        self._base_keys = base_keys
+        self._delta = delta
+        self._tombstones = tombstones
+        self.generation = f"{base.generation}+{version}"
+
+    def __len__(self) -> int:
+        added = sum(1 for key in self._delta if key not in self._base_keys)
+        removed = sum(1 for key in self._tombstones if key in self._base_keys)
+        return len(self.base) + added - removed
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        delta = self._delta
+        tombstones = self._tombstones
+        if not delta and not tombstones:
+            yield from self.base.rows()
+            return
+        for row in self.base.rows():
+            key = row["Investor_Name_Clean"]
+            if key in tombstones:
+                continue
+            yield delta.get(key, row)
+        for key, row in delta.items():
+            if key not in self._base_keys:
+                yield row
+
+    def changes(self) -> Tuple[Dict[str, Dict[str, Any]], FrozenSet[str]]:
+        """Ingested records by key (in first-added order) and deleted keys, on top of `base`."""
+        return self._delta, self._tombstones
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        key = investor_key(name)
+        if key in self._tombstones:
+            return None
+        if key in self._delta:
+            return self._delta[key]
+        index = self._base_keys.get(key)
+        if index is None:
+            return None
+        return {column: self.base[column][index].item() for column in self.base.columns}
+
+
+class InvestorStore:
+    """
+    Live add/update/delete of investor records on top of the compiled VC table.
+
+    Every change is appended to an NDJSON log (fsync'd, under a file lock so several worker
+    processes can share it) and then applied to the in-memory delta, with the cleaned and
+    taxonomy columns derived for just that record. Each process tails the log on read, so
+    changes made through any worker become visible everywhere; compaction atomically
+    rewrites the log to one entry per live change.
+    """
+
+    def __init__(self, path: Path = INVESTOR_LOG, table: str = INVESTOR_TABLE):
+        self.path = Path(path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._delta: Dict[str, Dict[str, Any]] = {}
+        self._tombstones: FrozenSet[str] = frozenset()
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._entries = 0
+        self._snapshot: Optional[InvestorSnapshot] = None
+        self._base_keys: Tuple[Optional[str], Dict[str, int]] = (None, {})
+
+    # --- reading ---
+
+    def snapshot(self) -> InvestorSnapshot:
+        """Consistent view including every change logged so far (by any process)."""
+        base = attach_table(self.table)
+        with self._lock:
+            changed = self._catch_up()
+            if changed or self._snapshot is None or self._snapshot.base is not base:
+                self._snapshot = InvestorSnapshot(
+                    base, self._keys_of(base), self._delta, self._tombstones, f"{self._inode or 0}-{self._offset}"
+                )
+            return self._snapshot
+
+    def _keys_of(self, base: TableView) -> Dict[str, int]:
+        generation, keys = self._base_keys
+        if generation != base.generation:
+            keys = {}
+            for index, key in enumerate(base["Investor_Name_Clean"]):
+                keys.setdefault(str(key), index)
+            self._base_keys = (base.generation, keys)
+        return keys
+
+    def _catch_up(self) -> bool:
+        """Apply log entries written since the last read; reload if the log was compacted (lock held)."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return False
+        reloaded = stat.st_ino != self._inode
+        if reloaded:
+            self._delta, self._tombstones = {}, frozenset()
+            self._inode, self._offset, self._entries = stat.st_ino, 0, 0
+        if stat.st_size <= self._offset:
+            return reloaded
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        # Only consume complete lines; a writer may be mid-append
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return reloaded
+        delta = dict(self._delta)
+        tombstones = set(self._tombstones)
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply_entry(json.loads(line), delta, tombstones)
+                self._entries += 1
+        self._delta, self._tombstones = delta, frozenset(tombstones)
+        self._offset += end
+        return True
+
+    def _apply_entry(self, entry: Dict[str, Any], delta: Dict[str, Dict[str, Any]], tombstones: set):
+        key = investor_key(entry["name"])
+        if entry["op"] == "delete":
+            delta.pop(key, None)
+            tombstones.add(key)
+        else:
+            tombstones.discard(key)
+            delta[key] = derive_record(self.table, entry["record"])
+
+    # --- writing ---
+
+    def apply(self, operations: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate, log and apply a batch of operations atomically with respect to readers.
+
+        Each operation is {"op": "upsert", <fields>} (missing fields keep their current
+        value) or {"op": "delete", "name": ...}. Raises ValueError on an invalid operation
+        before anything is written.
+        """
+        current = self.snapshot()
+        pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        entries = []
+        for operation in operations:
+            op = operation.get("op", "upsert")
+            name = str(operation.get("name") or "").strip()
+            if not name:
+                raise ValueError("Investor name is required")
+            key = investor_key(name)
+            if op == "delete":
+                exists = pending[key] is not None if key in pending else current.get(name) is not None
+                if not exists:
+                    raise ValueError(f"Unknown investor: {name}")
+                pending[key] = None
+                entries.append({"op": "delete", "name": name, "ts": time.time()})
+            elif op == "upsert":
+                existing = pending[key] if key in pending else current.get(name)
+                record = {source: (existing or {}).get(source, "") for source in FIELDS.values()}
+                for field, source in FIELDS.items():
+                    if operation.get(field) is not None:
+                        record[source] = str(operation[field]).strip()
+                record[FIELDS["name"]] = record[FIELDS["name"]] or name
+                pending[key] = record
+                entries.append({"op": "upsert", "name": name, "record": record, "ts": time.time()})
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+
+        if entries:
+            self._append(entries)
+        snapshot = self.snapshot()
+        self._maybe_compact()
+        return {"applied": len(entries), "generation": snapshot.generation}
+
+    @contextmanager
+    def _locked_log(self):
+        """Open the log for appending under an exclusive lock, retrying if it was compacted meanwhile."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            f = open(self.path, "ab")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(f.fileno()).st_ino:
+                break
+            # Locked a file that compaction already replaced; appending there would be lost
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+        try:
+            yield f
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        payload = "".join(json.dumps(entry) + "\n" for entry in entries).encode()
+        with self._locked_log() as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --- compaction ---
+
+    def _maybe_compact(self):
+        with self._lock:
+            live = len(self._delta) + len(self._tombstones)
+            due = self._entries >= COMPACT_MIN_ENTRIES and self._entries > COMPACT_RATIO * live
+        if due:
+            self.compact()
+
+    def compact(self) -> Dict[str, Any]:
+        """Rewrite the log as one entry per live change (atomic replace; other processes reload).
+
+        Updates become one upsert each; deletes are kept only for investors of the compiled table.
+        """
+        if not self.path.exists():
+            return {"entries_before": 0, "entries_after": 0}
+        base = attach_table(self.table)
+        with self._locked_log():
+            with self._lock:
+                # Everything appended so far, by any process, is folded in
+                self._catch_up()
+                before = self._entries
+                # A tombstone only matters for a compiled record; deleting an investor that was
+                # added through the API leaves nothing behind
+                base_keys = self._keys_of(base)
+                self._tombstones = frozenset(key for key in self._tombstones if key in base_keys)
+                now = time.time()
+                lines = [
+                    json.dumps({"op": "upsert", "name": row[FIELDS["name"]],
+                                "record": {source: row.get(source, "") for source in FIELDS.values()}, "ts": now})
+                    for row in self._delta.values()
+                ] + [json.dumps({"op": "delete", "name": key, "ts": now}) for key in sorted(self._tombstones)]
+                tmp = self.path.with_name(f"{self.path.name}.tmp-{os.getpid()}")
+                with open(tmp, "w") as f:
+                    f.write("".join(line + "\n" for line in lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                # Our state already equals the new file; adopt it without re-reading
+                stat = self.path.stat()
+                self._inode, self._offset, self._entries = stat.st_ino, stat.st_size, len(lines)
+                self._snapshot = None
+        return {"entries_before": before, "entries_after": len(lines)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "log_entries": self._entries,
+                "updated": len(self._delta),
+                "deleted": len(self._tombstones),
+                "log_bytes": self._offset
+            }
+
+
+_store: Optional[InvestorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> InvestorStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = InvestorStore()
+        return _store
+
+
+def investor_snapshot() -> InvestorSnapshot:
+    """The live investor table (compiled CSV plus ingested changes) for matching."""
+    return get_store().snapshot()
@@ -0,0 +1,183 @@
+import json
+from typing import Any, List, Optional
+
+CLOSERS = {'{': '}', '[': ']'}
+BARE_WORDS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+class JsonExtractor:
+    """
+    Incremental, tolerant extractor for the first JSON value in free-form LLM output.
+
+    Chunks are fed as they arrive and each character is processed once. Anything before
+    the first '{' or '[' (prose, code fences) is skipped, and so is anything after the
+    value closes. On the way it repairs the usual model mistakes: single-quoted strings,
+    Python True/False/None, raw newlines inside strings, trailing commas, and output
+    truncated by max_tokens (open strings and brackets are closed, a dangling partial
+    member is dropped).
+    """
+
+    def __init__(self):
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._word: List[str] = []
+        self.started = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of model output; returns True once a complete value was read."""
+        for c in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if c in CLOSERS:
+                    self.started = True
+                    self._stack.append(c)
+                    self._out.append(c)
+                continue
+            if self._quote:
+                self._feed_string(c)
+            else:
+                self._feed_structure(c)
+        return self.complete
+
+    def _feed_string(self, c: str):
+        out = self._out
+        if self._escape:
+            self._escape = False
+            if c == "'":
+                # \' is valid in a Python string but not in JSON
+                out[-1] = "'"
+            else:
+                out.append(c)
+        elif c == '\\':
+            out.append(c)
+            self._escape = True
+        elif c == self._quote:
+            out.append('"')
+            self._quote = None
+        elif c == '"':
+            out.append('\\"')
+        elif c == '\n':
+            out.append('\\n')
+        elif c == '\t':
+            out.append('\\t')
+        else:
+            out.append(c)
+
+    def _feed_structure(self, c: str):
+        out = self._out
+        if c.isalnum() or c in '_.+-':
+            self._word.append(c)
+            return
+        self._flush_word()
+        if c in '"\'':
+            self._quote = c
+            out.append('"')
+        elif c in CLOSERS:
+            self._stack.append(c)
+            out.append(c)
+        elif c in '}]':
+            _strip_trailing_comma(out)
+            if self._stack:
+                out.append(CLOSERS[self._stack.pop()])
+            if not self._stack:
+                self.complete = True
+        elif c == '`':
+            # Stray fence characters inside the structure are never valid JSON
+            return
+        else:
+            out.append(c)
+
+    def _flush_word(self):
+        if self._word:
+            word = ''.join(self._word)
+            self._out.append(BARE_WORDS.get(word, word))
+            self._word = []
+
+    def text(self) -> str:
+        """The repaired JSON text seen so far (not closed)."""
+        return ''.join(self._out)
+
+    def finish(self) -> Any:
+        """Close whatever is still open and parse the value; raises ValueError if it cannot be repaired."""
+        if not self.started:
+            raise ValueError("No JSON value found in LLM response")
+        if self._quote:
+            self._out.append('"')
+            self._quote = None
+        self._flush_word()
+
+        text = self.text()
+        while True:
+            try:
+                return json.loads(_close(text))
+            except json.JSONDecodeError:
+                # Drop the last (probably truncated) member and try again
+                cut = _last_structural_comma(text)
+                if cut is None:
+                    raise ValueError("Could not repair JSON in LLM response")
+                text = text[:cut]
+
+
+def _strip_trailing_comma(out: List[str]):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i:]
+
+
+def _scan(text: str):
+    """Yield (index, char) for structural characters of repaired text (double quotes only)."""
+    in_string = False
+    escape = False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        else:
+            yield i, c
+    # A final sentinel tells callers whether the text ends inside a string
+    yield len(text), 'STRING' if in_string else 'END'
+
+
+def _close(text: str) -> str:
+    """Terminate open strings and containers of a truncated JSON prefix."""
+    stack = []
+    for _, c in _scan(text):
+        if c in CLOSERS:
+            stack.append(c)
+        elif c in '}]' and stack:
+            stack.pop()
+        elif c == 'STRING':
+            text += '"'
+    text = text.rstrip()
+    if text.endswith(','):
+        text = text[:-1].rstrip()
+    if text.endswith(':'):
+        text += ' null'
+    return text + ''.join(CLOSERS[o] for o in reversed(stack))
+
+
+def _last_structural_comma(text: str) -> Optional[int]:
+    last = None
+    for i, c in _scan(text):
+        if c == ',':
+            last = i
+    return last
+
+
+def extract_json(text: str) -> Any:
+    """Extract and repair the first JSON value in a complete LLM response."""
+    extractor = JsonExtractor()
+    extractor.feed(text)
+    return extractor.finish()
@@ -1,54 +1,287 @@
-from typing import Optional
-from .openai_client import call_openai
-from .anthropic_client import call_claude
-
-def deduplicate_response(response: str) -> str:
-    """Remove duplicate lines and paragraphs from LLM response."""
-    lines = response.split('\n')
-    deduped_lines = []
-    prev_line = None
-    empty_line_count = 0
-    
-    for line in lines:
-        # Handle empty lines: allow max one empty line between content
-        if not line.strip():
-            empty_line_count += 1
-            if empty_line_count <= 1:
-                deduped_lines.append(line)
-            continue
-        
-        # Reset empty line counter when we hit content
-        empty_line_count = 0
-        
-        # Skip if line is identical to previous non-empty line
-        if line.strip() == (prev_line.strip() if prev_line else None):
-            continue
-            
-        deduped_lines.append(line)
-        prev_line = line
-    
-    # Clean up trailing empty lines
-    while deduped_lines and not deduped_lines[-1].strip():
-        deduped_lines.pop()
-    
-    return '\n'.join(deduped_lines)
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from .openai_client import call_openai, call_openai_json, stream_openai
+from .anthropic_client import call_claude, call_claude_json, stream_claude
+from .json_repair import extract_json
+from .postprocess import clean_stream, clean_text
+from .prompts import PromptTemplate, RenderedPrompt, count_tokens, record_usage, register_template
+from .singleflight import group, fingerprint
+from .batcher import SMALL_TASK_MAX_TOKENS, get_batcher
+from .token_budget import budgets
+from .profiling import span
+from .deadline import call_timeout, current_deadline, until_deadline
+
+Prompt = Union[str, RenderedPrompt]
+
+# Providers whose native structured-output (forced tool call) mode is used by route_llm_json;
+# the others get a JSON instruction appended and their text output repaired locally.
+NATIVE_JSON_PROVIDERS = set(filter(None, os.getenv("PITCHSENSE_NATIVE_JSON", "openai,anthropic").split(",")))
+
+MODEL_TIER_NAMES = ("fast", "quality")
+
+# Model per provider and tier; 'fast' is for short, low-stakes outputs
+MODEL_TIERS = {
+    "openai": {
+        "fast": os.getenv("PITCHSENSE_OPENAI_FAST_MODEL", "gpt-4o-mini"),
+        "quality": os.getenv("PITCHSENSE_OPENAI_QUALITY_MODEL", "gpt-4-turbo-preview"),
+    },
+    "anthropic": {
+        "fast": os.getenv("PITCHSENSE_ANTHROPIC_FAST_MODEL", "claude-3-haiku-20240307"),
+        "quality": os.getenv("PITCHSENSE_ANTHROPIC_QUALITY_MODEL", "claude-3-opus-20240229"),
+    },
+}
+
+# Default tier per task type; overridable per call (tier=...) or per request (use_model_tier)
+TASK_TIERS = {
+    "pitch_block": "quality",
+    "improve_section": "quality",
+    "regenerate": "quality",
+    "generate_email": "quality",
+    "score": "fast",
+    "clarify_question": "fast",
+    "investor_insight": "fast",
+}
+
+_tier_override: ContextVar[Optional[str]] = ContextVar("model_tier_override", default=None)
+
+# Output cap for one packed micro-batch call
+BATCH_MAX_OUTPUT_TOKENS = 4096
+
+BATCH_TEMPLATE = register_template(PromptTemplate(
+    name="micro_batch",
+    version="2",
+    prefix="""You will receive several independent requests, numbered in order.
+Answer each one exactly as you would if it were the only request; requests must not influence each other.
+Return a JSON object of the form {"answers": [...]} containing exactly one answer per request, in the same order.
+""",
+    suffix="""
+Number of requests: {count}
+{shared}
+{requests}"""
+))
+
+def provider_for(task_type: str) -> str:
+    """Return the provider ('openai' or 'anthropic') that serves a task type."""
+    if task_type in ["pitch_block", "improve_section", "regenerate", "score", "investor_insight"]:
+        return "openai"
+    elif task_type in ["clarify_question", "generate_email"]:
+        return "anthropic"
+    raise ValueError(f"Unknown task type: {task_type}")
+
+@contextmanager
+def use_model_tier(tier: Optional[str]):
+    """Force a model tier for every LLM call made in this context (e.g. one HTTP request)."""
+    if tier is not None and tier not in MODEL_TIER_NAMES:
+        raise ValueError(f"Unknown model tier: {tier}")
+    token = _tier_override.set(tier)
+    try:
+        yield
+    finally:
+        _tier_override.reset(token)
+
+def resolve_model(task_type: str, tier: Optional[str] = None) -> Tuple[str, str]:
+    """Return (provider, model) for a task: explicit tier, else request override, else task default."""
+    provider = provider_for(task_type)
+    tier = tier or _tier_override.get() or TASK_TIERS.get(task_type, "quality")
+    if tier not in MODEL_TIERS[provider]:
+        raise ValueError(f"Unknown model tier: {tier}")
+    return provider, MODEL_TIERS[provider][tier]
+
+def _client_args(provider: str, prompt: Prompt, max_tokens: Optional[int],
+                 task_type: Optional[str]) -> Dict[str, Any]:
+    """Client kwargs for a plain string or a rendered template, with usage accounting."""
+    def on_usage(usage: Dict[str, int]):
+        if task_type:
+            budgets.record(task_type, usage.get("output_tokens"), max_tokens)
+        if isinstance(prompt, RenderedPrompt):
+            record_usage(prompt, usage)
+
+    args: Dict[str, Any] = {"on_usage": on_usage}
+    if isinstance(prompt, RenderedPrompt):
+        args.update(prompt=prompt.suffix, prefix=prompt.prefix)
+        if provider == "anthropic":
+            # OpenAI caches long prefixes on its own; Claude needs an explicit breakpoint
+            args["cache_prefix"] = prompt.template.cacheable
+    else:
+        args["prompt"] = prompt
+    if max_tokens is not None:
+        args["max_tokens"] = max_tokens
+    # Bounded by the request's remaining time; raises before calling if there is none left
+    timeout = call_timeout()
+    if timeout is not None:
+        args["timeout"] = timeout
+    return args
+
+def _call_text(provider: str, model: str, prompt: Prompt, max_tokens: Optional[int],
+               task_type: Optional[str] = None) -> str:
+    deadline = current_deadline()
+    if deadline is None:
+        call = call_openai if provider == "openai" else call_claude
+        return call(model=model, **_client_args(provider, prompt, max_tokens, task_type))
+    # Under a deadline the reply is streamed, so a cancelled or expired request closes the
+    # connection mid-generation instead of waiting for (and paying for) the full reply
+    stream = stream_openai if provider == "openai" else stream_claude
+    chunks = stream(model=model, **_client_args(provider, prompt, max_tokens, task_type))
+    return "".join(until_deadline(chunks, deadline)).strip()
+
+def _call_json(provider: str, model: str, prompt: Prompt, schema: Dict[str, Any], name: str,
+               max_tokens: Optional[int], task_type: Optional[str] = None) -> Any:
+    if provider in NATIVE_JSON_PROVIDERS:
+        call_json = call_openai_json if provider == "openai" else call_claude_json
+        return call_json(schema=schema, name=name, model=model, **_client_args(provider, prompt, max_tokens, task_type))
+
+    # Fences and blank lines are stripped, but no dedupe: repeated values are meaningful in JSON
+    instruction = f"\n\nRespond with only a JSON value matching this schema:\n{json.dumps(schema)}"
+    if isinstance(prompt, RenderedPrompt):
+        prompt = RenderedPrompt(prompt.template, prompt.suffix + instruction)
+    else:
+        prompt = prompt + instruction
+    return extract_json(clean_text(_call_text(provider, model, prompt, max_tokens, task_type), dedupe=False))
+
+def _pack(prompts) -> Tuple[int, str, str]:
+    """Batch template fields; requests rendered from one template share a single copy of its prefix."""
+    templates = {p.template for p in prompts if isinstance(p, RenderedPrompt)}
+    if len(templates) == 1 and all(isinstance(p, RenderedPrompt) for p in prompts):
+        shared = f"\nInstructions that apply to every request:\n{prompts[0].prefix.strip()}\n"
+        bodies = [p.suffix.strip() for p in prompts]
+    else:
+        shared = ""
+        bodies = [str(p) for p in prompts]
+    requests = "\n\n".join(f"### Request {i}\n{body}" for i, body in enumerate(bodies, 1))
+    return len(prompts), shared, requests
+
+def _answer_tokens(answer: Any) -> int:
+    return count_tokens(answer if isinstance(answer, str) else json.dumps(answer))
 
-def route_llm_call(task_type: str, prompt: str, max_tokens: Optional[int] = None) -> str:
+def _run_batch(provider: str, model: str, task_type: str, item_schema: Dict[str, Any]):
+    """Build the batch runner: pack prompts into one structured call and split the answers."""
+    batch_schema = {
+        "type": "object",
+        "properties": {"answers": {"type": "array", "items": item_schema}},
+        "required": ["answers"]
+    }
+
+    def run(prompts, max_tokens):
+        count, shared, requests = _pack(prompts)
+        packed = BATCH_TEMPLATE.render(count=count, shared=shared, requests=requests)
+        budget = min(sum(max_tokens) + 50 * len(prompts), BATCH_MAX_OUTPUT_TOKENS)
+        result = _call_json(provider, model, packed, batch_schema, "batch_answers", budget)
+        answers = result.get("answers") if isinstance(result, dict) else result
+        if not isinstance(answers, list) or len(answers) != len(prompts):
+            return None
+        if item_schema.get("type") == "string" and not all(isinstance(a, str) for a in answers):
+            return None
+        # The provider reports usage for the whole batch; each item's share feeds its task's budget
+        for answer, item_budget in zip(answers, max_tokens):
+            budgets.record(task_type, _answer_tokens(answer), item_budget)
+        return answers
+
+    return run
+
+def _batched(provider: str, model: str, task_type: str, kind: str, item_schema: Dict[str, Any],
+             prompt: Prompt, max_tokens: int, individual):
+    """Answer a small request through the micro-batcher, falling back to an individual call."""
+    batcher = get_batcher((task_type, kind, model), _run_batch(provider, model, task_type, item_schema))
+    ok, result = batcher.submit(prompt, max_tokens)
+    return result if ok else individual()
+
+def _batchable(batch: bool, max_tokens: Optional[int]) -> bool:
+    return batch and max_tokens is not None and max_tokens <= SMALL_TASK_MAX_TOKENS
+
+def route_llm_call(task_type: str, prompt: Prompt, max_tokens: Optional[int] = None, batch: bool = False,
+                   tier: Optional[str] = None) -> str:
     """Route LLM calls to appropriate provider based on task type.
     
     Args:
-        task_type: Type of task to route ('pitch_block', 'regenerate', 'score', 'clarify_question', 'generate_email')
-        prompt: The prompt to send to the LLM
-        max_tokens: Optional maximum number of tokens for response
+        task_type: Type of task to route ('pitch_block', 'improve_section', 'regenerate', 'score',
+            'clarify_question', 'generate_email', 'investor_insight')
+        prompt: The prompt to send to the LLM, either a string or a rendered PromptTemplate
+            (whose static prefix is sent first, cacheably once long enough, and whose token
+            usage is recorded)
+        max_tokens: Optional cap on response tokens; the budget actually sent adapts to the
+            output lengths observed for this task type
+        batch: Allow packing this call with concurrent small calls of the same task type
+            (only applies when max_tokens <= SMALL_TASK_MAX_TOKENS)
+        tier: Optional model tier ('fast' or 'quality') overriding the task's default
         
     Returns:
-        str: The deduplicated LLM response
+        str: The LLM response, cleaned by the streaming post-processor (fences, blank
+            lines, repeated sentences and paragraphs removed)
     """
-    if task_type in ["pitch_block", "regenerate", "score"]:
-        response = call_openai(prompt, max_tokens=max_tokens)
-    elif task_type in ["clarify_question", "generate_email"]:
-        response = call_claude(prompt, max_tokens=max_tokens)
-    else:
-        raise ValueError(f"Unknown task type: {task_type}")
-    
-    return deduplicate_response(response)
+    provider, model = resolve_model(task_type, tier)
+    max_tokens = budgets.budget(task_type, max_tokens)
+
+    def call():
+        individual = lambda: _call_text(provider, model, prompt, max_tokens, task_type)
+        if _batchable(batch, max_tokens):
+            return _batched(provider, model, task_type, "text", {"type": "string"}, prompt, max_tokens, individual)
+        return individual()
+
+    # Identical concurrent calls share one provider request
+    key = fingerprint(task_type, model, str(prompt), max_tokens)
+    with span(f"llm:{task_type}"):
+        response = group("llm_call").do(key, call)
+    return clean_text(response)
+
+def route_llm_stream(task_type: str, prompt: Prompt, max_tokens: Optional[int] = None,
+                     tier: Optional[str] = None) -> Iterator[str]:
+    """Stream a text completion, cleaned incrementally as chunks arrive.
+
+    Same routing, model tiers and token budgets as route_llm_call, but never coalesced or
+    batched: each caller gets its own provider stream. Text is yielded as soon as the
+    post-processor knows it is not a repeat; the stream is closed once the calling
+    request's deadline expires or the client disconnects.
+
+    Args:
+        task_type: Type of task to route (see route_llm_call)
+        prompt: The prompt to send to the LLM (string or rendered PromptTemplate)
+        max_tokens: Optional cap on response tokens (adaptive, see route_llm_call)
+        tier: Optional model tier ('fast' or 'quality') overriding the task's default
+
+    Returns:
+        Iterator over cleaned text chunks
+    """
+    provider, model = resolve_model(task_type, tier)
+    max_tokens = budgets.budget(task_type, max_tokens)
+    stream = stream_openai if provider == "openai" else stream_claude
+    chunks = stream(model=model, **_client_args(provider, prompt, max_tokens, task_type))
+    return clean_stream(until_deadline(chunks, current_deadline()))
+
+def route_llm_json(task_type: str, prompt: Prompt, schema: Dict[str, Any], name: str,
+                   max_tokens: Optional[int] = None, batch: bool = False, tier: Optional[str] = None) -> Any:
+    """Route a structured-output LLM call and return the parsed JSON value.
+
+    Uses the provider's tool-calling mode where enabled. Otherwise the schema is appended
+    to the prompt and the free-form reply goes through the tolerant JSON extractor, so a
+    malformed reply is repaired locally instead of triggering another generation.
+
+    Args:
+        task_type: Type of task to route (see route_llm_call)
+        prompt: The prompt to send to the LLM (string or rendered PromptTemplate)
+        schema: JSON schema of the expected value (an object)
+        name: Name of the structured result (used as the tool name)
+        max_tokens: Optional cap on response tokens (adaptive, see route_llm_call)
+        batch: Allow packing this call with concurrent small calls of the same task type and schema
+        tier: Optional model tier ('fast' or 'quality') overriding the task's default
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        ValueError: If no JSON value could be recovered from the response
+    """
+    provider, model = resolve_model(task_type, tier)
+    max_tokens = budgets.budget(task_type, max_tokens)
+
+    def call():
+        individual = lambda: _call_json(provider, model, prompt, schema, name, max_tokens, task_type)
+        if _batchable(batch, max_tokens):
+            return _batched(provider, model, task_type, name, schema, prompt, max_tokens, individual)
+        return individual()
+
+    key = fingerprint(task_type, model, str(prompt), name, schema, max_tokens)
+    with span(f"llm:{task_type}"):
+        return group("llm_json").do(key, call)
@@ -1,33 +1,154 @@
 import os
-from typing import Optional
-from openai import OpenAI
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from dotenv import load_dotenv
+from .json_repair import extract_json
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Used when the router does not pick a model tier
+DEFAULT_MODEL = "gpt-4-turbo-preview"
 
-def call_openai(prompt: str, temperature: float = 0.7, max_tokens: Optional[int] = None) -> str:
+@lru_cache(maxsize=None)
+def get_client():
+    """Build the OpenAI client on first use so importing this module stays cheap."""
+    from openai import OpenAI
+
+    load_dotenv()
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def _messages(prompt: str, prefix: Optional[str]) -> List[Dict[str, str]]:
+    # The static instructions go first, as the system message. OpenAI caches identical
+    # prompt prefixes automatically once the prompt reaches 1024 tokens.
+    if prefix:
+        return [{"role": "system", "content": prefix}, {"role": "user", "content": prompt}]
+    return [{"role": "user", "content": prompt}]
+
+def _report_usage(response, on_usage: Optional[Callable[[Dict[str, int]], None]]):
+    if on_usage is None or getattr(response, "usage", None) is None:
+        return
+    usage = response.usage
+    details = getattr(usage, "prompt_tokens_details", None)
+    on_usage({
+        "input_tokens": usage.prompt_tokens,
+        "output_tokens": usage.completion_tokens,
+        "cached_input_tokens": getattr(details, "cached_tokens", 0) or 0,
+    })
+
+def call_openai(prompt: str, temperature: float = 0.7, max_tokens: Optional[int] = None,
+                prefix: Optional[str] = None,
+                on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                model: Optional[str] = None, timeout: Optional[float] = None) -> str:
     """Send a prompt to OpenAI GPT-4 and return the completion.
 
     Args:
-        prompt: The user prompt to send to GPT-4.
+        prompt: The user prompt to send to GPT-4 (the variable part, if `prefix` is given).
         temperature: Sampling temperature.
         max_tokens: Maximum tokens to generate in the response.
+        prefix: Optional static instructions sent ahead of the prompt as the system message.
+        on_usage: Optional callback receiving input/output/cached token counts.
+        model: Model to use (defaults to DEFAULT_MODEL).
+        timeout: Optional request timeout in seconds (the caller's remaining deadline).
 
     Returns:
         The generated text response, stripped of leading/trailing whitespace.
     """
     params = {
-        "model": "gpt-4-turbo-preview",
-        "messages": [{"role": "user", "content": prompt}],
+        "model": model or DEFAULT_MODEL,
+        "messages": _messages(prompt, prefix),
         "temperature": temperature
     }
     
     if max_tokens is not None:
         params["max_tokens"] = max_tokens
+    if timeout is not None:
+        params["timeout"] = timeout
+
+    try:
+        response = get_client().chat.completions.create(**params)
+    except Exception as e:
+        raise Exception(f"OpenAI API error: {str(e)}")
+    _report_usage(response, on_usage)
+    return response.choices[0].message.content.strip()
+
+def stream_openai(prompt: str, temperature: float = 0.7, max_tokens: Optional[int] = None,
+                  prefix: Optional[str] = None,
+                  on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                  model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+    """Stream a completion from OpenAI, yielding text deltas as they arrive.
+
+    Same arguments as call_openai. Token usage is reported once the stream ends; closing the
+    generator early closes the connection.
+    """
+    params = {
+        "model": model or DEFAULT_MODEL,
+        "messages": _messages(prompt, prefix),
+        "temperature": temperature,
+        "stream": True,
+        "stream_options": {"include_usage": True}
+    }
+
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if timeout is not None:
+        params["timeout"] = timeout
+
+    try:
+        stream = get_client().chat.completions.create(**params)
+    except Exception as e:
+        raise Exception(f"OpenAI API error: {str(e)}")
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # The final chunk carries usage and no choices
+            _report_usage(chunk, on_usage)
+    finally:
+        # Closing the connection early stops the generation (and its billing)
+        stream.close()
+
+def call_openai_json(prompt: str, schema: Dict[str, Any], name: str, temperature: float = 0.7,
+                     max_tokens: Optional[int] = None, prefix: Optional[str] = None,
+                     on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                     model: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+    """Send a prompt to OpenAI and return a JSON value matching `schema`.
+
+    Uses forced tool calling, so the model emits the value as function arguments instead of
+    free-form text. Arguments that still come back malformed (e.g. cut off by max_tokens)
+    are repaired locally rather than re-requested.
+
+    Args:
+        prompt: The user prompt to send to GPT-4 (the variable part, if `prefix` is given).
+        schema: JSON schema of the expected value (must describe an object).
+        name: Tool name the value is returned under.
+        temperature: Sampling temperature.
+        max_tokens: Maximum tokens to generate in the response.
+        prefix: Optional static instructions sent ahead of the prompt as the system message.
+        on_usage: Optional callback receiving input/output/cached token counts.
+        model: Model to use (defaults to DEFAULT_MODEL).
+        timeout: Optional request timeout in seconds (the caller's remaining deadline).
+
+    Returns:
+        The parsed JSON value.
+    """
+    params = {
+        "model": model or DEFAULT_MODEL,
+        "messages": _messages(prompt, prefix),
+        "temperature": temperature,
+        "tools": [{"type": "function", "function": {"name": name, "parameters": schema}}],
+        "tool_choice": {"type": "function", "function": {"name": name}}
+    }
+
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if timeout is not None:
+        params["timeout"] = timeout
 
     try:
-        response = client.chat.completions.create(**params)
-        return response.choices[0].message.content.strip()
+        response = get_client().chat.completions.create(**params)
     except Exception as e:
         raise Exception(f"OpenAI API error: {str(e)}")
+    _report_usage(response, on_usage)
+
+    message = response.choices[0].message
+    if message.tool_calls:
+        return extract_json(message.tool_calls[0].function.arguments)
+    return extract_json(message.content or "")
@@ -0,0 +1,110 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional
+from .context import bind_context
+from .generator import build_email_context, generate_email_from_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 16
+
+# Deterministic email for the tail of a ranked investor list (no LLM call)
+TEMPLATE_EMAIL = """Subject: {startup_name} x {investor_name}: {ask_headline}
+
+Hi {greeting_name},
+
+{traction_headline} {ask_headline}{focus_line}
+
+Would you be open to a 20-minute call in the next two weeks?
+
+Best,
+{your_name}
+{startup_name} | {your_email}"""
+
+
+def _first_sentence(text: str) -> str:
+    text = text.strip()
+    if not text:
+        return ""
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    return (match.group(1) if match else text).strip()
+
+
+def render_template_email(context: Dict[str, str], investor: Dict[str, Any]) -> str:
+    """
+    Render an outreach email from the shared context and one investor record, without an LLM.
+
+    Uses only the first sentence of the traction and ask sections plus the investor's focus,
+    so it stays short and never repeats information.
+    """
+    investor_name = investor.get("name", "") or "there"
+    focus = investor.get("focus", "")
+    focus_line = f" Given your focus on {focus}, I think we'd be a strong fit for your portfolio." if focus else ""
+    ask_headline = _first_sentence(context["ask_summary"]) or f"{context['startup_name']} is raising."
+    traction_headline = _first_sentence(context["traction_summary"])
+    return TEMPLATE_EMAIL.format(
+        startup_name=context["startup_name"],
+        investor_name=investor_name,
+        greeting_name=investor_name.split()[0] if investor_name else "there",
+        traction_headline=traction_headline,
+        ask_headline=ask_headline,
+        focus_line=focus_line,
+        your_name=context["your_name"],
+        your_email=context["your_email"]
+    ).replace("\n\n ", "\n\n")
+
+
+def generate_bulk_emails(pitch_json: Dict[str, Any], investors: List[Dict[str, Any]],
+                         your_name: str = "", startup_name: str = "", your_email: str = "",
+                         llm_top_n: Optional[int] = None,
+                         concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Dict[str, Any]]:
+    """
+    Generate personalized emails for a ranked investor list, yielding each as soon as it is done.
+
+    The pitch context is built once and shared by every email; each LLM prompt adds the
+    investor's name, focus, stage and location. The first `llm_top_n` investors (all, if
+    None) get an LLM email, generated concurrently by at most `concurrency` threads; the rest
+    use the deterministic template. If an LLM email fails, that investor falls back to the
+    template email.
+
+    Yields:
+        Dicts with keys: index (rank in `investors`), investor, email, mode ('llm', 'template'
+        or 'template_fallback') and, on fallback, error.
+    """
+    context = build_email_context(pitch_json, your_name=your_name, startup_name=startup_name, your_email=your_email)
+    llm_count = len(investors) if llm_top_n is None else max(0, min(llm_top_n, len(investors)))
+
+    # The template tail is instant; send it first so the client sees progress immediately
+    for index in range(llm_count, len(investors)):
+        investor = investors[index]
+        yield {"index": index, "investor": investor, "email": render_template_email(context, investor), "mode": "template"}
+
+    if llm_count == 0:
+        return
+
+    workers = max(1, min(concurrency, MAX_CONCURRENCY, llm_count))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outreach")
+    try:
+        futures = {
+            executor.submit(bind_context(generate_email_from_context), context, investors[index]): index
+            for index in range(llm_count)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            investor = investors[index]
+            try:
+                yield {"index": index, "investor": investor, "email": future.result(), "mode": "llm"}
+            except Exception as e:
+                logger.warning(f'LLM email for {investor.get("name", "")} failed: {str(e)}')
+                yield {
+                    "index": index,
+                    "investor": investor,
+                    "email": render_template_email(context, investor),
+                    "mode": "template_fallback",
+                    "error": str(e)
+                }
+    finally:
+        # Stop queued generations if the consumer goes away (e.g. the client disconnected)
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,233 @@
+import re
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+# Streaming clean-up of LLM text output. Chunks are processed as they arrive; text is
+# released as soon as it is known not to be a repeat, so a streamed reply reaches the client
+# while it is still being generated, and a non-streamed reply goes through the same code.
+#
+# - Code fence lines (```lang / ```) are removed, keeping the fenced content.
+# - Runs of blank lines collapse to one; leading and trailing blank lines are dropped.
+# - Sentences repeated anywhere earlier in the reply are dropped (short ones only when they
+#   repeat the sentence right before them, so 'Thanks.' twice in an email survives).
+# - Paragraphs repeated anywhere earlier are dropped as a whole.
+#
+# Every sentence gets a polynomial rolling hash of its normalized text (case-folded,
+# whitespace collapsed), updated one character at a time as chunks arrive; paragraphs hash
+# the sequence of their sentence hashes. No text is ever re-scanned, so the work per chunk
+# is proportional to the chunk, not to the reply so far.
+
+# Sentences shorter than this (normalized) are only deduplicated against the previous one
+MIN_SENTENCE_CHARS = 24
+
+_MODULUS = (1 << 61) - 1
+_BASE = 1_000_003
+_PARAGRAPH_BASE = 911_382_323
+
+_FENCE = re.compile(r"^\s*(```|~~~)[\w+#.-]*\s*$")
+_TERMINALS = ".!?"
+
+# Separators between emitted sentences, weakest first
+_SEPARATORS = ["", " ", "\n", "\n\n"]
+
+
+def _stronger(a: str, b: str) -> str:
+    return a if _SEPARATORS.index(a) >= _SEPARATORS.index(b) else b
+
+
+class _Sentence:
+    __slots__ = ("parts", "hash", "length", "end")
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.hash = 0
+        self.length = 0
+        # Separator that followed it in the source: ' ' (same line) or '\n'
+        self.end = " "
+
+
+class StreamPostProcessor:
+    """
+    Incremental fence stripping, blank-line collapsing and sentence/paragraph dedupe.
+
+    feed() takes the next chunk and returns the text that can be emitted now; finish()
+    returns whatever was held back. Concatenating every return value gives the cleaned
+    reply. With dedupe=False (JSON output) only fences and blank lines are handled.
+    """
+
+    def __init__(self, dedupe: bool = True):
+        self.dedupe = dedupe
+        # Sentence being read
+        self._current = _Sentence()
+        self._space = False
+        self._after_terminal = False
+        self._line: List[str] = []
+        self._line_has_sentences = False
+        self._line_blank = True
+        # Paragraph being read: its sentences are held while it could still be a repeat
+        self._held: List[_Sentence] = []
+        self._paragraph_hash = 0
+        self._paragraph_prefixes: List[int] = []
+        self._holding = False
+        # Everything seen in earlier sentences and paragraphs
+        self._seen_sentences: Set[int] = set()
+        self._seen_prefixes: Set[int] = set()
+        self._seen_paragraphs: Set[int] = set()
+        self._previous_sentence: Optional[int] = None
+        # Output state
+        self._emitted = False
+        self._separator = ""
+        self._out: List[str] = []
+
+    # --- input ---
+
+    def feed(self, chunk: str) -> str:
+        for char in chunk:
+            if char == "\n":
+                self._end_line()
+            elif char == "\r":
+                continue
+            else:
+                self._read(char)
+        return self._drain()
+
+    def finish(self) -> str:
+        self._end_line(final=True)
+        self._end_paragraph()
+        return self._drain()
+
+    def _read(self, char: str):
+        self._line.append(char)
+        sentence = self._current
+        if char.isspace():
+            if self._after_terminal and sentence.length:
+                sentence.end = " "
+                self._end_sentence()
+            elif sentence.length or not self._line_has_sentences:
+                # Inner whitespace, or the line's indentation (kept, but not hashed)
+                sentence.parts.append(char)
+                self._space = bool(sentence.length)
+            return
+        self._line_blank = False
+        if self._space and sentence.length:
+            sentence.hash = (sentence.hash * _BASE + 32) % _MODULUS
+            sentence.length += 1
+        self._space = False
+        sentence.parts.append(char)
+        sentence.hash = (sentence.hash * _BASE + ord(char.lower())) % _MODULUS
+        sentence.length += 1
+        self._after_terminal = char in _TERMINALS
+
+    def _end_line(self, final: bool = False):
+        line = "".join(self._line)
+        if not self._line_has_sentences and _FENCE.match(line):
+            # A fence line is dropped without leaving a line break behind
+            self._current = _Sentence()
+        elif self._line_blank:
+            self._current = _Sentence()
+            if not final:
+                self._end_paragraph()
+                self._separate("\n\n")
+        elif self._current.length:
+            self._current.end = "\n"
+            self._end_sentence()
+        elif not final:
+            self._separate("\n")
+        self._line = []
+        self._line_has_sentences = False
+        self._line_blank = True
+        self._space = False
+        self._after_terminal = False
+
+    def _end_sentence(self):
+        sentence = self._current
+        self._current = _Sentence()
+        self._space = False
+        self._after_terminal = False
+        self._line_has_sentences = True
+        # Trailing whitespace inside the sentence is replaced by its separator
+        while sentence.parts and sentence.parts[-1].isspace():
+            sentence.parts.pop()
+        if not self.dedupe:
+            self._release(sentence)
+            return
+        self._paragraph_hash = (self._paragraph_hash * _PARAGRAPH_BASE + sentence.hash + 1) % _MODULUS
+        self._paragraph_prefixes.append(self._paragraph_hash)
+        if self._paragraph_hash in self._seen_prefixes:
+            # So far this paragraph starts like an earlier one; wait and see
+            self._holding = True
+            self._held.append(sentence)
+            return
+        self._holding = False
+        self._flush_held()
+        self._release(sentence)
+
+    def _end_paragraph(self):
+        if self.dedupe and self._paragraph_prefixes:
+            if self._holding and self._paragraph_hash in self._seen_paragraphs:
+                # The whole paragraph repeats an earlier one
+                for sentence in self._held:
+                    self._drop(sentence)
+                self._held = []
+            else:
+                self._flush_held()
+            self._seen_prefixes.update(self._paragraph_prefixes)
+            self._seen_paragraphs.add(self._paragraph_hash)
+        self._paragraph_hash = 0
+        self._paragraph_prefixes = []
+        self._holding = False
+
+    # --- output ---
+
+    def _flush_held(self):
+        held, self._held = self._held, []
+        for sentence in held:
+            self._release(sentence)
+
+    def _release(self, sentence: _Sentence):
+        """Emit a sentence unless it repeats an earlier one."""
+        if self.dedupe:
+            repeated = sentence.hash == self._previous_sentence or (
+                sentence.length >= MIN_SENTENCE_CHARS and sentence.hash in self._seen_sentences
+            )
+            self._previous_sentence = sentence.hash
+            self._seen_sentences.add(sentence.hash)
+            if repeated:
+                self._drop(sentence)
+                return
+        if self._emitted:
+            self._out.append(self._separator)
+        self._out.append("".join(sentence.parts))
+        self._emitted = True
+        self._separator = sentence.end
+
+    def _drop(self, sentence: _Sentence):
+        # The text goes, but the line break it carried still separates what surrounds it
+        if self._emitted:
+            self._separator = _stronger(self._separator, sentence.end if sentence.end == "\n" else "")
+
+    def _separate(self, separator: str):
+        if self._emitted:
+            self._separator = _stronger(self._separator, separator)
+
+    def _drain(self) -> str:
+        out = "".join(self._out)
+        self._out = []
+        return out
+
+
+def clean_text(text: str, dedupe: bool = True) -> str:
+    """Run a complete reply through the streaming post-processor."""
+    processor = StreamPostProcessor(dedupe=dedupe)
+    return processor.feed(text) + processor.finish()
+
+
+def clean_stream(chunks: Iterable[str], dedupe: bool = True) -> Iterator[str]:
+    """Clean a stream of reply chunks, yielding text as soon as it is safe to emit."""
+    processor = StreamPostProcessor(dedupe=dedupe)
+    for chunk in chunks:
+        out = processor.feed(chunk)
+        if out:
+            yield out
+    out = processor.finish()
+    if out:
+        yield out
@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .datasets import DATA_DIR
+
+# Share of requests profiled without asking (the X-Profile header always profiles)
+PROFILE_SAMPLE_RATE = float(os.getenv("PITCHSENSE_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PITCHSENSE_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_DIR = Path(os.getenv("PITCHSENSE_PROFILE_DIR", DATA_DIR / ".profiles"))
+MAX_PROFILES = 50
+MAX_STACK_DEPTH = 128
+
+FORMATS = {"speedscope": ".speedscope.json", "collapsed": ".collapsed"}
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("profile", default=None)
+
+
+class _Sampler:
+    """
+    One sampling thread for every active profile.
+
+    Each tick takes a single snapshot of all thread stacks and hands it to the active
+    profiles; the thread sleeps while nothing is being profiled.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._profiles: Set["Profile"] = set()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: "Profile"):
+        with self._cond:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def remove(self, profile: "Profile"):
+        with self._cond:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._profiles:
+                    self._cond.wait()
+            time.sleep(self.interval)
+            with self._cond:
+                profiles = list(self._profiles)
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+
+
+_sampler = _Sampler()
+
+
+class Profile:
+    """
+    Sampling profile plus wall-clock spans of one request.
+
+    Only threads currently working for the request are sampled: a thread is attached while
+    it runs a span, a bind_context task or a sync route handler (routes.profiled), so
+    concurrent requests do not pollute each other. Async handlers and streamed bodies are
+    covered by their spans only.
+    Sampling is done by the shared sampler thread between start() and stop().
+    """
+
+    def __init__(self, label: str):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.interval = _sampler.interval
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.samples: Counter = Counter()
+        self.spans: List[Tuple[str, int, float, float]] = []
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @contextmanager
+    def attach(self):
+        """Sample the calling thread until the block exits (re-entrant)."""
+        tid = threading.get_ident()
+        with self._lock:
+            self._threads[tid] = self._threads.get(tid, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[tid] -= 1
+                if not self._threads[tid]:
+                    del self._threads[tid]
+
+    def sample(self, frames: Dict[int, Any]):
+        """Count the current stacks of the attached threads (called by the sampler)."""
+        with self._lock:
+            if self._stopped:
+                return
+            for tid in self._threads:
+                frame = frames.get(tid)
+                if frame is not None:
+                    self.samples[_collapse(frame)] += 1
+
+    def start(self):
+        _sampler.add(self)
+
+    def stop(self):
+        _sampler.remove(self)
+        with self._lock:
+            # After this no sample lands, even from a tick already in progress
+            self._stopped = True
+        self.finished = time.perf_counter()
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (flamegraph.pl, speedscope, inferno)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        """speedscope file: the sampled profile plus one evented span timeline per thread."""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[str, int] = {}
+
+        def frame_id(name: str) -> int:
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            return index[name]
+
+        interval_ms = self.interval * 1000
+        duration_ms = ((self.finished or time.perf_counter()) - self.started) * 1000
+        profiles: List[Dict[str, Any]] = [{
+            "type": "sampled",
+            "name": f"{self.label} (samples)",
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(self.samples.values()) * interval_ms,
+            "samples": [[frame_id(f) for f in stack.split(";")] for stack in self.samples],
+            "weights": [count * interval_ms for count in self.samples.values()]
+        }]
+        for tid in sorted({span[1] for span in self.spans}):
+            events = []
+            for name, span_tid, start, end in self.spans:
+                if span_tid == tid:
+                    events.append((start, 1, {"type": "O", "frame": frame_id(name), "at": (start - self.started) * 1000}))
+                    events.append((end, 0, {"type": "C", "frame": frame_id(name), "at": (end - self.started) * 1000}))
+            # Close before open at equal times; spans of one thread are properly nested
+            events.sort(key=lambda e: (e[0], e[1]))
+            profiles.append({
+                "type": "evented",
+                "name": f"{self.label} (spans, thread {tid})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": duration_ms,
+                "events": [event for _, _, event in events]
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": self.label,
+            "activeProfileIndex": 0,
+            "exporter": "pitchsense"
+        }
+
+    def save(self) -> Dict[str, Any]:
+        """Write both formats to PROFILE_DIR, prune old profiles and return a summary."""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        (PROFILE_DIR / f"{self.id}{FORMATS['collapsed']}").write_text(self.to_collapsed())
+        (PROFILE_DIR / f"{self.id}{FORMATS['speedscope']}").write_text(json.dumps(self.to_speedscope()))
+        _prune()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        spans: Dict[str, float] = {}
+        for name, _, start, end in self.spans:
+            spans[name] = round(spans.get(name, 0.0) + end - start, 4)
+        return {
+            "id": self.id,
+            "label": self.label,
+            "seconds": round((self.finished or time.perf_counter()) - self.started, 4),
+            "samples": sum(self.samples.values()),
+            "spans": spans
+        }
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def _prune():
+    saved = sorted(PROFILE_DIR.glob(f"*{FORMATS['speedscope']}"), key=lambda p: p.stat().st_mtime)
+    for path in saved[:-MAX_PROFILES]:
+        profile_id = path.name[:-len(FORMATS["speedscope"])]
+        for suffix in FORMATS.values():
+            (PROFILE_DIR / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+
+@contextmanager
+def profiling(profile: Profile):
+    """Make `profile` the active one for this context (and bind_context tasks it spawns)."""
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def profile_request(label: str):
+    """Profile everything run in this block (and in bind_context tasks it spawns)."""
+    profile = Profile(label)
+    profile.start()
+    try:
+        with profiling(profile):
+            yield profile
+    finally:
+        profile.stop()
+
+
+def span(name: str):
+    """Record a wall-clock span (and sample this thread) if the request is being profiled."""
+    profile = _current.get()
+    if profile is None:
+        return nullcontext()
+    return _span(profile, name)
+
+
+@contextmanager
+def _span(profile: Profile, name: str):
+    start = time.perf_counter()
+    try:
+        with profile.attach():
+            yield
+    finally:
+        profile.spans.append((name, threading.get_ident(), start, time.perf_counter()))
+
+
+def attach_thread():
+    """Sample the calling thread for the active profile, if any (bind_context, ProfiledRoute)."""
+    profile = _current.get()
+    return nullcontext() if profile is None else profile.attach()
+
+
+def profile_path(profile_id: str, fmt: str) -> Optional[Path]:
+    if not _PROFILE_ID.match(profile_id) or fmt not in FORMATS:
+        return None
+    path = PROFILE_DIR / f"{profile_id}{FORMATS[fmt]}"
+    return path if path.exists() else None
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not PROFILE_DIR.exists():
+        return []
+    saved = sorted(PROFILE_DIR.glob(f"*{FORMATS['speedscope']}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {"id": path.name[:-len(FORMATS["speedscope"])], "created_at": path.stat().st_mtime}
+        for path in saved
+    ]
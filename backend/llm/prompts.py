@@ -0,0 +1,131 @@
+import hashlib
+import threading
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # optional: fall back to the ~4 chars/token rule of thumb
+    _encoding = None
+
+# Smallest prompt either provider will cache (Claude prompt caching, OpenAI automatic prefix
+# caching). Claude prefixes at least this long are marked as cache breakpoints.
+MIN_CACHEABLE_PREFIX_TOKENS = 1024
+
+
+def count_tokens(text: str) -> int:
+    """Count (or, without tiktoken, estimate) the input tokens of a prompt fragment."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+
+class RenderedPrompt:
+    """A prompt split into the static prefix and the per-call suffix."""
+
+    def __init__(self, template: "PromptTemplate", suffix: str):
+        self.template = template
+        self.prefix = template.prefix
+        self.suffix = suffix
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class PromptTemplate:
+    """
+    A versioned prompt whose long instruction preamble never changes between calls.
+
+    `prefix` is sent verbatim and first (system message / first content block), so providers
+    can cache it once it reaches MIN_CACHEABLE_PREFIX_TOKENS (`cacheable`). `suffix` is a
+    str.format template for the variable part; it is parsed once here instead of on every
+    render.
+    """
+
+    def __init__(self, name: str, version: str, prefix: str, suffix: str):
+        self.name = name
+        self.version = version
+        self.prefix = prefix
+        self.suffix = suffix
+        self.prefix_tokens = count_tokens(prefix)
+        self.cacheable = self.prefix_tokens >= MIN_CACHEABLE_PREFIX_TOKENS
+        self.fingerprint = hashlib.sha256(prefix.encode()).hexdigest()[:12]
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(suffix)
+        ]
+        self.fields = sorted({field for _, field in self._parts if field})
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def render(self, **values: Any) -> RenderedPrompt:
+        """Fill the suffix from the precompiled parts; raises KeyError on a missing field."""
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return RenderedPrompt(self, "".join(out))
+
+
+TEMPLATES: Dict[str, PromptTemplate] = {}
+
+_stats_lock = threading.Lock()
+# Template key -> running totals of what was actually sent and billed
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    """Add a template to the registry (modules register theirs at import)."""
+    TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    if name not in TEMPLATES:
+        raise ValueError(f"Unknown prompt template: {name}")
+    return TEMPLATES[name]
+
+
+def record_usage(prompt: RenderedPrompt, usage: Dict[str, int]):
+    """
+    Account one call of a template.
+
+    `usage` is the normalized provider usage (input_tokens, output_tokens,
+    cached_input_tokens); local counts are used for anything the provider did not report.
+    """
+    template = prompt.template
+    suffix_tokens = count_tokens(prompt.suffix)
+    with _stats_lock:
+        stats = _stats.setdefault(template.key, {
+            "calls": 0, "prefix_tokens": template.prefix_tokens, "suffix_tokens": 0,
+            "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0,
+        })
+        stats["calls"] += 1
+        stats["suffix_tokens"] += suffix_tokens
+        stats["input_tokens"] += usage.get("input_tokens") or template.prefix_tokens + suffix_tokens
+        stats["cached_input_tokens"] += usage.get("cached_input_tokens") or 0
+        stats["output_tokens"] += usage.get("output_tokens") or 0
+
+
+def template_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-template token accounting: the share of input served from the prompt cache, and
+    whether each prefix is long enough to be cached at all."""
+    with _stats_lock:
+        report = {}
+        for key, stats in _stats.items():
+            entry = dict(stats)
+            total = stats["input_tokens"]
+            entry["cached_share"] = round(stats["cached_input_tokens"] / total, 3) if total else 0.0
+            report[key] = entry
+        for template in TEMPLATES.values():
+            report.setdefault(template.key, {"calls": 0, "prefix_tokens": template.prefix_tokens})
+            report[template.key]["fingerprint"] = template.fingerprint
+            report[template.key]["cacheable"] = template.cacheable
+        return report
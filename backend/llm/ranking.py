@@ -0,0 +1,95 @@
+import base64
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Ranked result sets kept per query fingerprint
+MAX_CACHED_QUERIES = 128
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class StaleCursorError(ValueError):
+    """The cursor was issued for another query or an older version of the data."""
+
+
+class RankedResults:
+    """
+    The scored candidates of one query, served page by page without rescoring.
+
+    Ordering is score descending, then candidate index ascending, so ties always break the
+    same way and pages never overlap or skip. A page is selected with a bounded heap over
+    the candidates after the cursor (O(n log page_size)) instead of sorting everything.
+    """
+
+    def __init__(self, key: str, version: str, scores: Sequence[float], items: Sequence[Dict[str, Any]]):
+        self.key = key
+        self.version = version
+        self.items = items
+        self._keys: List[Tuple[float, int]] = [(-score, index) for index, score in enumerate(scores)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Return {'items', 'next_cursor', 'total'}; pass next_cursor back for the following page."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        candidates = iter(self._keys)
+        if cursor:
+            after = self._decode(cursor)
+            candidates = (k for k in self._keys if k > after)
+
+        top = heapq.nsmallest(limit + 1, candidates)
+        next_cursor = self._encode(top[limit - 1]) if len(top) > limit else None
+        return {
+            "items": [self.items[index] for _, index in top[:limit]],
+            "next_cursor": next_cursor,
+            "total": len(self._keys)
+        }
+
+    def _encode(self, position: Tuple[float, int]) -> str:
+        raw = f"{self.key}:{self.version}:{position[0]!r}:{position[1]}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode(self, cursor: str) -> Tuple[float, int]:
+        try:
+            key, version, neg_score, index = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+            position = (float(neg_score), int(index))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if key != self.key or version != self.version:
+            raise StaleCursorError("Cursor does not belong to this query or the data changed; start from the first page")
+        return position
+
+
+class RankingCache:
+    """LRU of RankedResults per (query fingerprint, data version)."""
+
+    def __init__(self, max_queries: int = MAX_CACHED_QUERIES):
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[Tuple[str, str], RankedResults]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_rank(self, key: str, version: str, rank: Callable[[], RankedResults]) -> RankedResults:
+        """Return the cached ranking, or compute it with `rank()` (callers coalesce concurrent misses)."""
+        cache_key = (key, version)
+        with self._lock:
+            if cache_key in self._results:
+                self.hits += 1
+                self._results.move_to_end(cache_key)
+                return self._results[cache_key]
+            self.misses += 1
+        ranked = rank()
+        with self._lock:
+            self._results[cache_key] = ranked
+            self._results.move_to_end(cache_key)
+            while len(self._results) > self.max_queries:
+                self._results.popitem(last=False)
+        return ranked
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"queries": len(self._results), "hits": self.hits, "misses": self.misses}
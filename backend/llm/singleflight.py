@@ -0,0 +1,125 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
+from .deadline import DeadlineExceeded, MIN_CALL_SECONDS, current_deadline, wait_event
+
+# A caller joins an in-flight call only if the leader's deadline is at most this much earlier
+# than its own; otherwise the leader may give up (or degrade) while the caller still has time
+COALESCE_SLACK_SECONDS = 5.0
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+        # Leader's deadline (monotonic), None when it has none
+        self.expires_at: Optional[float] = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight computation.
+
+    The first caller for a key (the leader) runs the function; callers arriving while it is
+    still running wait for and receive the same result, or the same exception. Nothing is
+    cached afterwards: once the call finishes, the next caller starts a fresh one.
+
+    The computation runs under the leader's request deadline, so a caller only joins a leader
+    whose deadline is not much earlier than its own; one with more time runs the call itself.
+    Waiting is bounded by the caller's own deadline, and if the leader times out or its client
+    goes away, a caller that still has time runs the call again instead of sharing the error.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        deadline = current_deadline()
+        expires_at = deadline.expires_at if deadline is not None else None
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                call.expires_at = expires_at
+            elif self._can_join(call, expires_at):
+                call.waiters += 1
+                self.coalesced += 1
+            else:
+                # The in-flight call would give up before this caller has to: run it separately
+                call = None
+
+        if call is None:
+            return fn()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                call.done.set()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        wait_event(call.done)
+        if isinstance(call.error, DeadlineExceeded) and (deadline is None or deadline.remaining() >= MIN_CALL_SECONDS):
+            # The leader's deadline or cancellation, not this caller's
+            return self.do(key, fn)
+        if call.error is not None:
+            raise call.error
+        # Followers get their own copy so no caller can mutate another's result
+        return copy.deepcopy(call.result)
+
+    @staticmethod
+    def _can_join(call: _Call, expires_at: Optional[float]) -> bool:
+        if call.expires_at is None:
+            return True
+        if expires_at is None:
+            return False
+        return call.expires_at >= expires_at - COALESCE_SLACK_SECONDS
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "hit_rate": round(self.coalesced / self.calls, 3) if self.calls else 0.0,
+                "inflight": len(self._inflight)
+            }
+
+GROUPS: Dict[str, SingleFlight] = {}
+
+def group(name: str) -> SingleFlight:
+    """Return the named coalescing group, creating it on first use."""
+    if name not in GROUPS:
+        GROUPS.setdefault(name, SingleFlight(name))
+    return GROUPS[name]
+
+def coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: flight.stats() for name, flight in GROUPS.items()}
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+def fingerprint(*parts: Any) -> str:
+    """Hash of whitespace-normalized inputs, used as the coalescing key."""
+    canonical = json.dumps(_normalize(list(parts)), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
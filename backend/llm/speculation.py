@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from .context import bind_context
+from .deadline import DeadlineExceeded, detached, wait_future
+from .improver import regenerate_pitch_section
+from .singleflight import fingerprint
+
+logger = logging.getLogger(__name__)
+
+# How many of the lowest-confidence red sections are pre-generated per pitch
+SPECULATIVE_SECTIONS = int(os.getenv("PITCHSENSE_SPECULATIVE_SECTIONS", "2"))
+# Spare-capacity budget: a small dedicated pool, and speculation is skipped while it is backed up
+SPECULATIVE_WORKERS = int(os.getenv("PITCHSENSE_SPECULATIVE_WORKERS", "2"))
+MAX_PENDING = 2 * SPECULATIVE_WORKERS
+# Unused results older than this are discarded
+SPECULATION_TTL_SECONDS = 30 * 60
+MAX_ENTRIES = 512
+
+
+class _Entry:
+    def __init__(self, future: Future):
+        self.future = future
+        self.created_at = time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.created_at > SPECULATION_TTL_SECONDS
+
+
+class SpeculativeRegenerator:
+    """
+    Pre-computes regenerate_pitch_section results for the sections most likely to be regenerated.
+
+    Entries are keyed by section name and the exact section text, so a result can only be
+    served for the text it was generated from: once the section changes (improved, edited)
+    the old entry no longer matches and is dropped. A request that arrives while its
+    speculation is still running waits for it instead of starting a second generation.
+    """
+
+    def __init__(self, workers: int = SPECULATIVE_WORKERS, max_pending: int = MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative")
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pending = 0
+        self.scheduled = 0
+        self.skipped = 0
+        self.hits = 0
+        self.inflight_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.failed = 0
+
+    def speculate(self, pitch_data: Dict[str, Any], confidence_scores: Dict[str, Dict[str, Any]],
+                  limit: int = SPECULATIVE_SECTIONS) -> int:
+        """Schedule regeneration of the `limit` lowest-confidence red sections; returns how many were queued."""
+        red = sorted(
+            (name for name, score in confidence_scores.items()
+             if score.get('color') == 'red' and isinstance(pitch_data.get(name), dict)),
+            key=lambda name: confidence_scores[name].get('confidence', 0.0)
+        )
+        queued = 0
+        for name in red[:limit]:
+            text = pitch_data[name].get('text', '')
+            if text and self._schedule(name, text):
+                queued += 1
+        return queued
+
+    def _schedule(self, section_name: str, current_text: str) -> bool:
+        key = fingerprint(section_name, current_text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.expired:
+                return False
+            if self._pending >= self._max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+            self.scheduled += 1
+            # Outlives the request that triggered it: not bound by its deadline or cancellation
+            future = self._executor.submit(bind_context(detached(regenerate_pitch_section)), section_name, current_text)
+            self._entries[key] = _Entry(future)
+            self._entries.move_to_end(key)
+            self._evict()
+        future.add_done_callback(lambda f: self._done(key, f))
+        return True
+
+    def _evict(self):
+        # Oldest first: drop expired results and anything over the size cap (lock held)
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if not oldest.expired and len(self._entries) <= MAX_ENTRIES:
+                break
+            self._entries.popitem(last=False)
+            if oldest.expired:
+                self.stale += 1
+
+    def _done(self, key: str, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if not future.cancelled() and future.exception() is not None:
+                self.failed += 1
+                self._entries.pop(key, None)
+                logger.warning(f'Speculative regeneration failed: {str(future.exception())}')
+
+    def take(self, section_name: str, current_text: str) -> Optional[Dict[str, Any]]:
+        """Return (and consume) the pre-generated result for this exact section text, if any."""
+        key = fingerprint(section_name, current_text)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expired:
+                self.stale += 1
+                self.misses += 1
+                return None
+            running = not entry.future.done()
+            if running:
+                self.inflight_hits += 1
+            else:
+                self.hits += 1
+        try:
+            # The speculation itself is detached; waiting for it is bounded by this request's deadline
+            return wait_future(entry.future)
+        except DeadlineExceeded:
+            # Not a hit after all; leave the result for a retry of this request
+            with self._lock:
+                self._uncount_hit(running)
+                self._entries.setdefault(key, entry)
+            raise
+        except Exception:
+            # A failed speculation is simply a miss; the caller regenerates normally
+            with self._lock:
+                self._uncount_hit(running)
+                self.misses += 1
+            return None
+
+    def _uncount_hit(self, running: bool):
+        # Undo whichever counter take() incremented (lock held)
+        if running:
+            self.inflight_hits -= 1
+        else:
+            self.hits -= 1
+
+    def discard(self, section_name: str, current_text: str):
+        """Drop the speculation for a section text that is about to change."""
+        with self._lock:
+            entry = self._entries.pop(fingerprint(section_name, current_text), None)
+        if entry is not None:
+            entry.future.cancel()
+
+    def regenerate(self, section_name: str, current_text: str) -> Dict[str, Any]:
+        """regenerate_pitch_section, served from the speculative cache when possible."""
+        result = self.take(section_name, current_text)
+        if result is not None:
+            return {**result, "speculative": True}
+        return {**regenerate_pitch_section(section_name, current_text), "speculative": False}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self.hits + self.inflight_hits
+            requests = served + self.misses
+            return {
+                "scheduled": self.scheduled,
+                "skipped": self.skipped,
+                "pending": self._pending,
+                "cached": len(self._entries),
+                "hits": self.hits,
+                "inflight_hits": self.inflight_hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "failed": self.failed,
+                "hit_rate": round(served / requests, 3) if requests else 0.0
+            }
+
+
+speculator = SpeculativeRegenerator()
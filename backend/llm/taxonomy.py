@@ -0,0 +1,191 @@
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Shared vocabularies for funding stages and sectors (locations resolve through the
+# gazetteer). Every term is interned as a small integer code, and the stage and sector sets
+# of each VC are encoded as bitmasks when the datasets are compiled, so matching and
+# valuation compare codes and masks instead of re-parsing strings on every request.
+
+# Bump whenever a vocabulary, alias or compatibility rule changes: compiled datasets
+# carry the masks computed with it and are rebuilt when it differs.
+TAXONOMY_VERSION = 2
+
+# --- Stages (ordered from earliest to latest) ---
+
+STAGES: List[str] = ["pre-seed", "seed", "series a", "series b", "series c", "series d", "late", "pre-ipo"]
+STAGE_CODES: Dict[str, int] = {name: code for code, name in enumerate(STAGES)}
+STAGE_ALIASES: Dict[str, str] = {
+    "pre seed": "pre-seed",
+    "preseed": "pre-seed",
+    "late stage": "late",
+    "growth": "late",
+    "pre ipo": "pre-ipo",
+}
+# Open-ended stage ranges used by some funds, as (first, last) stage inclusive
+STAGE_SPANS: Dict[str, Tuple[str, str]] = {
+    "series b+": ("series b", "pre-ipo"),
+    "early to ipo": ("seed", "pre-ipo"),
+}
+ALL_STAGES = (1 << len(STAGES)) - 1
+# Set in a VC's mask when its stage text is non-empty but names no known stage; such a VC
+# fits no startup of known stage (an empty stage text, by contrast, fits every startup)
+UNKNOWN_STAGE = 1 << len(STAGES)
+
+# --- Sectors: (name, aliases, parent). Children come before their parent so the most
+# specific sector wins; matching code that wants the coarse view uses the parent. ---
+
+SECTOR_DEFINITIONS: List[Tuple[str, List[str], Optional[str]]] = [
+    ("artificial intelligence", ["ai", "ml", "machine learning", "artificial intelligence", "ai/ml"], None),
+    ("fintech", ["fintech", "financial", "payment", "payments", "banking", "finance"], None),
+    ("ecommerce", ["e-commerce", "ecommerce", "retail", "marketplace"], None),
+    ("biotech", ["biotech", "life science", "life sciences"], "health"),
+    ("health", ["health", "healthcare", "healthtech", "medical", "med device"], None),
+    ("software", ["software", "saas", "internet software", "tech"], None),
+    ("edtech", ["edtech", "education", "learning"], None),
+    ("supply chain", ["supply chain", "logistics", "transportation"], None),
+    ("data", ["data", "big data", "analytics", "data management"], None),
+    ("hardware", ["hardware", "iot", "devices"], None),
+    ("blockchain", ["blockchain", "crypto", "web3"], None),
+    ("gaming", ["gaming", "games", "entertainment"], None),
+    ("food", ["food", "agtech", "agriculture"], None),
+    ("energy", ["energy", "climate", "cleantech"], None),
+    ("other", ["other", "various", "general"], None),
+]
+SECTORS: List[str] = [name for name, _, _ in SECTOR_DEFINITIONS]
+SECTOR_CODES: Dict[str, int] = {name: code for code, name in enumerate(SECTORS)}
+SECTOR_PARENTS: Dict[int, int] = {
+    SECTOR_CODES[name]: SECTOR_CODES[parent] for name, _, parent in SECTOR_DEFINITIONS if parent
+}
+
+def _alias_pattern(aliases: List[str]) -> "re.Pattern[str]":
+    # Whole words only: 'ai' must not match 'retail', 'tech' must not match 'edtech'
+    return re.compile(r"(?<![\w])(?:" + "|".join(re.escape(a) for a in sorted(aliases, key=len, reverse=True)) + r")(?![\w])")
+
+
+_SECTOR_PATTERNS = [(SECTOR_CODES[name], _alias_pattern(aliases)) for name, aliases, _ in SECTOR_DEFINITIONS]
+
+
+def _normalize(text) -> str:
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    return str(text).lower().strip()
+
+
+def bit(code: int) -> int:
+    return 1 << code
+
+
+# --- Stage lookups ---
+
+def stage_code(text) -> Optional[int]:
+    """Interned code of one stage name ('Series A', 'pre seed', ...), or None if unknown."""
+    name = _normalize(text)
+    name = STAGE_ALIASES.get(name, name)
+    return STAGE_CODES.get(name)
+
+
+@lru_cache(maxsize=1024)
+def stage_mask(text: str) -> int:
+    """
+    Bitmask of the stages in a comma-separated list such as 'Pre-Seed, Seed, Series A'.
+
+    Ranges ('Series B+', 'Early to IPO') set every stage they cover. Text naming no known
+    stage gives UNKNOWN_STAGE; callers comparing against known stages mask it off.
+    """
+    mask = 0
+    for part in _normalize(text).split(","):
+        part = part.strip()
+        if part in STAGE_SPANS:
+            first, last = STAGE_SPANS[part]
+            for code in range(STAGE_CODES[first], STAGE_CODES[last] + 1):
+                mask |= bit(code)
+            continue
+        code = stage_code(part)
+        if code is not None:
+            mask |= bit(code)
+    if not mask and _normalize(text):
+        return UNKNOWN_STAGE
+    return mask
+
+
+def _stages(*names: str) -> int:
+    mask = 0
+    for name in names:
+        mask |= bit(STAGE_CODES[name])
+    return mask
+
+
+# For a startup at a given stage, the VC stages that are a fit. Stages without an entry
+# (late, unknown) are compatible with every VC.
+STAGE_COMPATIBILITY: Dict[int, int] = {
+    STAGE_CODES["seed"]: _stages("seed", "pre-seed"),
+    STAGE_CODES["series a"]: _stages("seed", "series a", "pre-seed"),
+    STAGE_CODES["series b"]: _stages("series a", "series b", "seed"),
+    STAGE_CODES["series c"]: _stages("series b", "series c", "series a"),
+    STAGE_CODES["series d"]: _stages("series c", "series d", "series b"),
+    STAGE_CODES["pre-ipo"]: _stages("series c", "series d", "pre-ipo"),
+}
+
+SEED_STAGES = _stages("pre-seed", "seed")
+
+
+def is_stage_compatible(startup_stage: Optional[int], vc_stage_mask: int) -> bool:
+    """
+    Single bitwise test. A VC without stage data, or a startup of unknown or late stage,
+    always fits; a VC whose stage text names no known stage fits nothing else.
+    """
+    if startup_stage is None or not vc_stage_mask or startup_stage not in STAGE_COMPATIBILITY:
+        return True
+    return bool(STAGE_COMPATIBILITY[startup_stage] & vc_stage_mask)
+
+
+def infer_stage_from_valuation(valuation_b) -> Optional[int]:
+    """Stage code implied by a valuation in $B (None when the valuation is missing or zero)."""
+    if valuation_b is None or (isinstance(valuation_b, float) and math.isnan(valuation_b)) or valuation_b == 0:
+        return None
+    for limit, name in ((2, "series a"), (5, "series b"), (10, "series c"), (30, "series d"), (100, "late")):
+        if valuation_b < limit:
+            return STAGE_CODES[name]
+    return STAGE_CODES["pre-ipo"]
+
+
+def stage_name(code: Optional[int]) -> str:
+    return STAGES[code] if code is not None else "unknown"
+
+
+# --- Sector lookups ---
+
+@lru_cache(maxsize=4096)
+def sector_codes(text: str) -> Tuple[int, ...]:
+    """Codes of every sector mentioned in a free-text industry or fund-focus string, in vocabulary order."""
+    normalized = _normalize(text)
+    return tuple(code for code, pattern in _SECTOR_PATTERNS if pattern.search(normalized))
+
+
+def sector_code(text: str) -> Optional[int]:
+    """The most specific sector of a text, or None."""
+    codes = sector_codes(text)
+    return codes[0] if codes else None
+
+
+def primary_sector(text: str) -> Optional[int]:
+    """The top-level sector of a text (children collapsed into their parent), or None."""
+    code = sector_code(text)
+    return SECTOR_PARENTS.get(code, code) if code is not None else None
+
+
+def sector_mask(text: str) -> int:
+    """Bitmask of every sector in a text; a sub-sector also sets its parent's bit."""
+    mask = 0
+    for code in sector_codes(text):
+        mask |= bit(code)
+        if code in SECTOR_PARENTS:
+            mask |= bit(SECTOR_PARENTS[code])
+    return mask
+
+
+def sector_name(code: Optional[int]) -> Optional[str]:
+    return SECTORS[code] if code is not None else None
+
@@ -0,0 +1,67 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# Observations kept per task, and how many are needed before budgets adapt
+WINDOW = 200
+MIN_SAMPLES = 20
+PERCENTILE = 0.95
+HEADROOM = 1.25
+FLOOR_TOKENS = 32
+# If more than this share of recent replies hit the adapted budget, go back to the caller's cap
+MAX_TRUNCATION_RATE = 0.02
+
+
+class TokenBudgets:
+    """
+    Adaptive max_tokens per task type, learned from observed output lengths.
+
+    The caller's max_tokens is treated as a cap. Once enough replies were observed, the
+    budget becomes the 95th percentile output length plus headroom, never above the cap.
+    Replies that run into the adapted budget count as truncations; too many of them and the
+    task falls back to its cap until the distribution recovers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[int]] = {}
+        self._truncated: Dict[str, Deque[bool]] = {}
+
+    def budget(self, task_type: str, cap: Optional[int]) -> Optional[int]:
+        if cap is None:
+            return None
+        with self._lock:
+            samples = sorted(self._samples.get(task_type, ()))
+            truncated = self._truncated.get(task_type, ())
+            if len(samples) < MIN_SAMPLES:
+                return cap
+            if sum(truncated) / len(truncated) > MAX_TRUNCATION_RATE:
+                return cap
+        observed = samples[int(PERCENTILE * (len(samples) - 1))]
+        return max(FLOOR_TOKENS, min(cap, int(observed * HEADROOM) + 8))
+
+    def record(self, task_type: str, output_tokens: Optional[int], budget: Optional[int]):
+        if not output_tokens:
+            return
+        with self._lock:
+            self._samples.setdefault(task_type, deque(maxlen=WINDOW)).append(output_tokens)
+            self._truncated.setdefault(task_type, deque(maxlen=WINDOW)).append(
+                budget is not None and output_tokens >= budget
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {}
+            for task_type, samples in self._samples.items():
+                ordered = sorted(samples)
+                truncated = self._truncated[task_type]
+                report[task_type] = {
+                    "samples": len(ordered),
+                    "p50_output_tokens": ordered[len(ordered) // 2],
+                    "p95_output_tokens": ordered[int(PERCENTILE * (len(ordered) - 1))],
+                    "truncation_rate": round(sum(truncated) / len(truncated), 3)
+                }
+            return report
+
+
+budgets = TokenBudgets()
@@ -0,0 +1,56 @@
+import logging
+import os
+import time
+from typing import Dict, Any, Callable
+from .datasets import TABLES, prepare_tables, attach_table
+from .gazetteer import location_index
+from .investors import investor_snapshot
+from .openai_client import get_client as get_openai_client
+from .anthropic_client import get_client as get_anthropic_client
+
+logger = logging.getLogger(__name__)
+
+# Open provider connections during warm-up (one cheap authenticated request each)
+PROBE_PROVIDERS = os.getenv("PITCHSENSE_WARM_CONNECTIONS", "1") == "1"
+
+# Components the service cannot answer requests without; providers only degrade it
+REQUIRED_COMPONENTS = ["datasets"]
+
+# Component name -> {"ready": bool, "seconds": float, "error": str}
+readiness: Dict[str, Dict[str, Any]] = {}
+
+def _warm(component: str, fn: Callable[[], None]):
+    start = time.perf_counter()
+    try:
+        fn()
+        readiness[component] = {"ready": True, "seconds": round(time.perf_counter() - start, 3)}
+    except Exception as e:
+        logger.warning(f'Warm-up of {component} failed: {str(e)}')
+        readiness[component] = {"ready": False, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+
+def warm_datasets():
+    """Publish the dataset cache (building it if the sources changed), attach every table, replay the investor log and index VC offices."""
+    prepare_tables()
+    for name in TABLES:
+        attach_table(name)
+    location_index(investor_snapshot())
+
+def warm_openai():
+    client = get_openai_client()
+    if PROBE_PROVIDERS:
+        client.models.list()
+
+def warm_anthropic():
+    client = get_anthropic_client()
+    if PROBE_PROVIDERS:
+        client.models.list(limit=1)
+
+def warm_up() -> Dict[str, Dict[str, Any]]:
+    """Preload datasets and construct provider clients so the first request does not pay for them."""
+    _warm("datasets", warm_datasets)
+    _warm("openai", warm_openai)
+    _warm("anthropic", warm_anthropic)
+    return readiness
+
+def is_ready() -> bool:
+    return all(readiness.get(c, {}).get("ready") for c in REQUIRED_COMPONENTS)
@@ -1,15 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import random
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from server.routes.pitch import router as pitch_router
+from server.routes.jobs import router as jobs_router
+from server.routes.tracker import router as tracker_router
+from server.routes.investors import router as investors_router
+from server.routes.export import router as export_router
+from server.services.jobs import get_queue
+from server.services.export import shutdown_pool as shutdown_export_pool
+from server.llm.warmup import warm_up, is_ready, readiness
+from server.llm.prompts import template_stats
+from server.llm.singleflight import coalescing_stats
+from server.llm.batcher import batching_stats
+from server.llm.llm_router import MODEL_TIER_NAMES, use_model_tier
+from server.llm.token_budget import budgets
+from server.llm.speculation import speculator
+from server.llm.profiling import PROFILE_SAMPLE_RATE, Profile, profiling, profile_path, list_profiles
+from server.llm.deadline import DEFAULT_REQUEST_SECONDS, MAX_REQUEST_SECONDS, Deadline, DeadlineExceeded, RequestCancelled, deadline_scope
 
 # Load environment variables from .env into os.environ
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build/attach the shared dataset cache and open provider connections before serving.
+    # With --workers N the first worker builds under a file lock and the others just attach.
+    await run_in_threadpool(warm_up)
+    # Background workers for /api/jobs; they resume jobs orphaned by a previous process
+    get_queue().start()
+    yield
+    get_queue().stop()
+    shutdown_export_pool()
+
 app = FastAPI(
     title="PitchSense Agent API",
     description="Generate investor pitch slides and cold emails from structured startup input.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -21,4 +53,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def model_tier(request: Request, call_next):
+    """X-Model-Tier: fast|quality forces one model tier for every LLM call of the request."""
+    tier = request.headers.get("x-model-tier") or None
+    if tier is not None and tier not in MODEL_TIER_NAMES:
+        return JSONResponse(status_code=400, content={'detail': f"Unknown model tier: {tier}"})
+    with use_model_tier(tier):
+        return await call_next(request)
+
+@app.middleware("http")
+async def profiler(request: Request, call_next):
+    """Profile a request when it sends X-Profile: 1, or for a PITCHSENSE_PROFILE_SAMPLE_RATE share of traffic."""
+    if request.headers.get("x-profile") != "1" and not (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE):
+        return await call_next(request)
+    profile = Profile(f"{request.method} {request.url.path}")
+    profile.start()
+    try:
+        with profiling(profile):
+            response = await call_next(request)
+    except BaseException:
+        profile.stop()
+        raise
+    response.headers["X-Profile-Id"] = profile.id
+    response.body_iterator = _profiled_body(response.body_iterator, profile)
+    return response
+
+async def _profiled_body(body, profile):
+    """Stream the response body and end the profile once it is fully sent (or abandoned)."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        profile.stop()
+        await run_in_threadpool(profile.save)
+
+class DeadlineMiddleware:
+    """
+    Give every request a deadline and cancel it when the client disconnects.
+
+    X-Request-Timeout: <seconds> sets the budget (default PITCHSENSE_REQUEST_TIMEOUT_SECONDS,
+    capped at PITCHSENSE_MAX_REQUEST_TIMEOUT_SECONDS). LLM calls made for the request get the
+    time left as their timeout, and streams stop at the next chunk once it is cancelled.
+    A plain ASGI middleware, so it sees the disconnect while a sync endpoint is still running.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        header = dict(scope["headers"]).get(b"x-request-timeout")
+        try:
+            seconds = float(header) if header else DEFAULT_REQUEST_SECONDS
+            if not seconds > 0:
+                raise ValueError
+        except ValueError:
+            response = JSONResponse(status_code=400, content={'detail': 'X-Request-Timeout must be a positive number of seconds'})
+            return await response(scope, receive, send)
+        deadline = Deadline(min(seconds, MAX_REQUEST_SECONDS))
+
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = False
+        finished = False
+
+        async def pump():
+            # Keep reading the client side so a disconnect is seen even while nothing awaits receive()
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    if not finished:
+                        deadline.cancel("client disconnected")
+                await messages.put(message)
+                if disconnected:
+                    return
+
+        async def wrapped_receive():
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def wrapped_send(message):
+            nonlocal finished
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = True
+            await send(message)
+
+        reader = asyncio.ensure_future(pump())
+        try:
+            with deadline_scope(deadline):
+                await self.app(scope, wrapped_receive, wrapped_send)
+        finally:
+            reader.cancel()
+
+# Outermost, so the deadline is in place before the other middleware and every route
+app.add_middleware(DeadlineMiddleware)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    """504 when the request ran out of time; 499 (client closed request) when it was cancelled."""
+    status_code = 499 if isinstance(exc, RequestCancelled) else 504
+    return JSONResponse(status_code=status_code, content={'detail': str(exc)})
+
 app.include_router(pitch_router, prefix="/api", tags=["Pitch & Email"])
+app.include_router(jobs_router, prefix="/api", tags=["Jobs"])
+app.include_router(tracker_router, prefix="/api", tags=["Tracker"])
+app.include_router(investors_router, prefix="/api", tags=["Investors"])
+app.include_router(export_router, prefix="/api", tags=["Export"])
+
+@app.get('/ready', tags=["Ops"])
+def ready(response: Response):
+    """Readiness probe: 503 until warm-up has loaded everything the API needs."""
+    ok = is_ready()
+    if not ok:
+        response.status_code = 503
+    return {'ready': ok, 'components': readiness}
+
+@app.get('/metrics', tags=["Ops"])
+def metrics():
+    """Operational counters: prompt token usage and cache savings, coalescing, batching, token budgets, speculation."""
+    return {
+        'prompts': template_stats(),
+        'coalescing': coalescing_stats(),
+        'batching': batching_stats(),
+        'token_budgets': budgets.stats(),
+        'speculation': speculator.stats()
+    }
+
+@app.get('/profiles', tags=["Ops"])
+def profiles():
+    """Saved request profiles, newest first."""
+    return {'profiles': list_profiles()}
+
+@app.get('/profiles/{profile_id}', tags=["Ops"])
+def download_profile(profile_id: str, format: str = 'speedscope'):
+    """Download a profile as a speedscope file (speedscope.app) or collapsed stacks (flamegraph.pl)."""
+    path = profile_path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    return FileResponse(path, filename=path.name)
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from server.services.export import EXPORT_FORMATS, MAX_BATCH_DOCUMENTS, export_filenames, render, stream_zip
+from server.routes.profiled import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+class ExportDocument(BaseModel):
+    name: str
+    pitch: Dict[str, Any]
+    email: Optional[str] = None
+
+class ExportBatch(BaseModel):
+    format: str = 'docx'
+    documents: List[ExportDocument]
+
+def _check_format(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+@router.post('/export/batch')
+def export_batch(batch: ExportBatch):
+    """Render many pitches (generate_pitch_json output, optional email) and stream them back as one zip."""
+    _check_format(batch.format)
+    if len(batch.documents) > MAX_BATCH_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_DOCUMENTS} documents per export")
+    documents = [document.dict() for document in batch.documents]
+    return StreamingResponse(
+        stream_zip(batch.format, documents),
+        media_type='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="pitches-{batch.format}.zip"'}
+    )
+
+@router.post('/export/{fmt}')
+def export_document(fmt: str, document: ExportDocument):
+    """Render one pitch as docx, pptx or markdown, with sentences coloured by confidence."""
+    _check_format(fmt)
+    document = document.dict()
+    return Response(
+        content=render(fmt, document),
+        media_type=EXPORT_FORMATS[fmt][0],
+        headers={'Content-Disposition': f'attachment; filename="{export_filenames([document], fmt)[0]}"'}
+    )
@@ -0,0 +1,104 @@
+import json
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from typing import Optional
+from server.llm.investors import get_store, FIELDS
+from server.routes.profiled import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+class InvestorRecord(BaseModel):
+    name: str
+    stage: Optional[str] = None
+    focus: Optional[str] = None
+    location: Optional[str] = None
+
+class InvestorUpdate(BaseModel):
+    stage: Optional[str] = None
+    focus: Optional[str] = None
+    location: Optional[str] = None
+
+class InvestorDelete(BaseModel):
+    name: str
+
+# Bulk operation -> model its line must validate against (same as the single-record endpoints)
+BULK_MODELS = {'upsert': InvestorRecord, 'delete': InvestorDelete}
+
+def _investor(row):
+    return {field: row.get(source, '') for field, source in FIELDS.items()}
+
+def _apply(operations):
+    try:
+        return get_store().apply(operations)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get('/investors/{name}')
+def get_investor(name: str):
+    row = get_store().snapshot().get(name)
+    if row is None:
+        raise HTTPException(status_code=404, detail='Investor not found')
+    return _investor(row)
+
+@router.post('/investors')
+def add_investor(investor: InvestorRecord):
+    """Add an investor (or overwrite the given fields of an existing one); visible to matching immediately."""
+    return _apply([{'op': 'upsert', **investor.dict()}])
+
+@router.patch('/investors/{name}')
+def update_investor(name: str, update: InvestorUpdate):
+    if get_store().snapshot().get(name) is None:
+        raise HTTPException(status_code=404, detail='Investor not found')
+    return _apply([{'op': 'upsert', 'name': name, **update.dict()}])
+
+@router.delete('/investors/{name}')
+def delete_investor(name: str):
+    if get_store().snapshot().get(name) is None:
+        raise HTTPException(status_code=404, detail='Investor not found')
+    return _apply([{'op': 'delete', 'name': name}])
+
+@router.post('/investors/bulk')
+async def bulk_investors(request: Request):
+    """Apply NDJSON operations, one per line: {"op": "upsert"|"delete", "name": ..., "stage", "focus", "location"}.
+
+    Every line is validated like the single-record endpoints' bodies; if any line fails, the
+    response lists each failing line (400 for malformed JSON, 422 otherwise) and nothing is
+    applied. Otherwise the batch is applied all-or-nothing; readers see either none or all of it.
+    """
+    operations = []
+    errors = []
+    malformed = False
+    for number, line in enumerate((await request.body()).decode().splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            operation = json.loads(line)
+        except json.JSONDecodeError as e:
+            malformed = True
+            errors.append({'line': number, 'errors': [str(e)]})
+            continue
+        if not isinstance(operation, dict):
+            malformed = True
+            errors.append({'line': number, 'errors': ['expected a JSON object']})
+            continue
+        op = operation.get('op', 'upsert')
+        if op not in BULK_MODELS:
+            errors.append({'line': number, 'errors': [f'Unknown operation: {op}']})
+            continue
+        try:
+            record = BULK_MODELS[op](**{k: v for k, v in operation.items() if k != 'op'})
+        except ValidationError as e:
+            errors.append({'line': number, 'errors': [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+        operations.append({'op': op, **record.dict()})
+    if errors:
+        raise HTTPException(status_code=400 if malformed else 422, detail=errors)
+    return await run_in_threadpool(_apply, operations)
+
+@router.post('/investors/compact')
+def compact_investor_log():
+    """Rewrite the ingestion log to one entry per live change (also runs automatically)."""
+    return get_store().compact()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from server.routes.pitch import StartupInfo
+from server.services.jobs import get_queue, TERMINAL_STATUSES
+from server.routes.profiled import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+STREAM_POLL_SECONDS = 0.5
+
+def _job_status(job):
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'stages': job['stages'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+
+@router.post('/jobs/generate_pitch', status_code=202)
+def submit_pitch_job(startup_info: StartupInfo):
+    """Queue the /generate_pitch workflow; identical submissions return the same job."""
+    job, created = get_queue().submit('pitch_workflow', startup_info.dict())
+    return {**_job_status(job), 'created': created}
+
+@router.get('/jobs/{job_id}')
+def get_job(job_id: str):
+    job = get_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return {**_job_status(job), 'partial': job['partial'], 'result': job['result']}
+
+@router.get('/jobs/{job_id}/stream')
+async def stream_job(job_id: str):
+    """
+    Stream NDJSON events: one per finished stage (with its partial result), then the final status.
+
+    When the job is retried, a retry event is sent and the new attempt's stages are streamed
+    again; results of earlier attempts are superseded.
+    """
+    queue = get_queue()
+    if await run_in_threadpool(queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+
+    async def events():
+        attempt, sent = None, set()
+        while True:
+            job = await run_in_threadpool(queue.get, job_id)
+            if job['attempts'] != attempt:
+                # A new attempt starts from scratch, so its stages are all new
+                if attempt is not None and job['attempts'] > 0:
+                    yield json.dumps({'event': 'retry', 'attempt': job['attempts']}) + '\n'
+                attempt = job['attempts']
+                sent = set()
+            for stage, timing in sorted(job['stages'].items(), key=lambda item: item[1]['finished_at']):
+                if stage not in sent:
+                    sent.add(stage)
+                    yield json.dumps({'event': 'stage', 'stage': stage, 'seconds': timing['seconds'],
+                                      'result': job['partial'].get(stage)}) + '\n'
+            if job['status'] in TERMINAL_STATUSES:
+                yield json.dumps({'event': 'done', **_job_status(job), 'result': job['result']}) + '\n'
+                return
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type='application/x-ndjson')
@@ -1,84 +1,32 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-import pandas as pd
+from typing import Optional
+import math
 from difflib import SequenceMatcher
+from server.llm.gazetteer import TIER_COUNTRY, TIER_METRO, TIER_REGION, TIER_STATE, location_index, resolve
+from server.llm.investors import investor_snapshot
+from server.llm.ranking import RankedResults, RankingCache, StaleCursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from server.llm.singleflight import group, fingerprint
+from server.llm.taxonomy import (
+    SEED_STAGES, infer_stage_from_valuation, is_stage_compatible, primary_sector, sector_name, stage_name
+)
 
 app = FastAPI()
 
-# Load VC and startup data
-df_vc = pd.read_csv("VC_FundStage_Location_Sector.csv")
-df_startup = pd.read_csv("Startup Insights (2012-2021) Copy export 2025-05-23 23-37-23.csv")
-
-# Preprocessing
-df_vc["Fund_Focus_Clean"] = df_vc["Fund Focus (Sectors)"].fillna("").str.lower().str.strip()
-df_vc["Location_Clean"] = df_vc["Location"].fillna("").str.lower().str.strip()
-df_vc["Fund_Stage_Clean"] = df_vc["Fund Stage"].fillna("").str.lower().str.strip()
-df_vc["Investor_Name_Clean"] = df_vc["Investor Name"].fillna("").str.lower().str.strip()
-
-industry_mapping = {
-    'artificial intelligence': ['ai', 'ml', 'machine learning', 'artificial intelligence', 'ai/ml'],
-    'fintech': ['fintech', 'financial', 'payment', 'banking', 'finance'],
-    'ecommerce': ['e-commerce', 'ecommerce', 'retail', 'marketplace'],
-    'health': ['health', 'healthcare', 'medical', 'biotech', 'life science', 'med device'],
-    'software': ['software', 'saas', 'internet software', 'tech'],
-    'edtech': ['edtech', 'education', 'learning'],
-    'supply chain': ['supply chain', 'logistics', 'transportation'],
-    'data': ['data', 'big data', 'analytics', 'data management'],
-    'hardware': ['hardware', 'iot', 'devices'],
-    'blockchain': ['blockchain', 'crypto', 'web3'],
-    'gaming': ['gaming', 'games', 'entertainment'],
-    'food': ['food', 'agtech', 'agriculture'],
-    'energy': ['energy', 'climate', 'cleantech'],
-    'other': ['other', 'various', 'general']
-}
-
 def normalize_industry(industry_text):
-    industry_text = str(industry_text).lower().strip()
-    for standard, variations in industry_mapping.items():
-        if any(var in industry_text for var in variations):
-            return standard
-    return industry_text
+    # Top-level taxonomy sector, or the cleaned text itself when no sector is recognized
+    sector = primary_sector(industry_text)
+    return sector_name(sector) if sector is not None else str(industry_text).lower().strip()
+
+def is_missing(value):
+    # Scalar pd.isna without pulling pandas onto the import path
+    return value is None or (isinstance(value, float) and math.isnan(value))
 
 def calculate_similarity(str1, str2):
     return SequenceMatcher(None, str1, str2).ratio()
 
-def infer_startup_stage_from_valuation(val):
-    if pd.isna(val) or val == 0:
-        return "unknown"
-    elif val < 2:
-        return "series a"
-    elif val < 5:
-        return "series b"
-    elif val < 10:
-        return "series c"
-    elif val < 30:
-        return "series d"
-    elif val < 100:
-        return "late"
-    else:
-        return "pre-ipo"
-
-def is_stage_compatible(startup_stage, vc_stages_str):
-    if pd.isna(vc_stages_str) or startup_stage == "unknown":
-        return True
-
-    vc_stages_str = str(vc_stages_str).lower()
-    stage_keywords = {
-        'seed': ['seed', 'pre-seed'],
-        'series a': ['seed', 'series a', 'pre-seed'],
-        'series b': ['series a', 'series b', 'seed'],
-        'series c': ['series b', 'series c', 'series a'],
-        'series d': ['series c', 'series d', 'series b'],
-        'pre-ipo': ['series c', 'series d', 'pre-ipo']
-    }
-
-    if startup_stage in stage_keywords:
-        return any(keyword in vc_stages_str for keyword in stage_keywords[startup_stage])
-
-    return True
-
 def check_existing_investor_match(startup_investors, vc_name):
-    if pd.isna(startup_investors) or pd.isna(vc_name):
+    if is_missing(startup_investors) or is_missing(vc_name):
         return False
 
     startup_investors = str(startup_investors).lower()
@@ -87,6 +35,14 @@ def check_existing_investor_match(startup_investors, vc_name):
 
     return any(keyword in startup_investors for keyword in vc_keywords if len(keyword) > 2)
 
+# Points and reason per gazetteer match tier (deepest level shared with the startup)
+LOCATION_POINTS = {
+    TIER_METRO: (3, "same metro area"),
+    TIER_STATE: (2, "same state"),
+    TIER_COUNTRY: (2, "same country"),
+    TIER_REGION: (1, "regional match"),
+}
+
 class Startup(BaseModel):
     name: str
     valuation: float
@@ -95,55 +51,87 @@ class Startup(BaseModel):
     country: str
     has_investor: str = ""
 
-@app.post("/api/match")
-def match(startup: Startup):
-    results = []
-    startup_industry = normalize_industry(startup.industry)
-    startup_city = startup.city.lower().strip()
-    startup_country = startup.country.lower().strip()
-    startup_investors = startup.has_investor.lower()
-    startup_stage = infer_startup_stage_from_valuation(startup.valuation)
-
-    for _, vc in df_vc.iterrows():
-        score = 0
-        reasons = []
-
-        vc_focus = str(vc["Fund_Focus_Clean"])
-        vc_industry_normalized = normalize_industry(vc_focus)
-
-        if startup_industry == vc_industry_normalized:
-            score += 4
-            reasons.append(f"perfect industry match ({startup_industry})")
-        elif startup_industry in vc_focus or any(word in vc_focus for word in startup_industry.split()):
-            score += 3
-            reasons.append(f"industry overlap ({startup_industry})")
-        elif calculate_similarity(startup_industry, vc_focus) > 0.3:
-            score += 2
-            reasons.append("similar industry")
-
-        vc_location = str(vc["Location_Clean"])
-        if startup_country in vc_location:
-            score += 2
-            reasons.append("same country")
-        elif startup_city in vc_location:
-            score += 1
-            reasons.append("same city")
-        elif any(region in vc_location for region in ['asia', 'europe', 'america']) and startup_country != 'united states':
-            score += 1
-            reasons.append("regional match")
-
-        if is_stage_compatible(startup_stage, vc["Fund_Stage_Clean"]):
-            score += 2
-            reasons.append(f"stage fit ({startup_stage})")
-
-        if check_existing_investor_match(startup_investors, vc["Investor Name"]):
-            score += 1
-            reasons.append("existing investor")
-
-        if startup.valuation > 50 and 'seed' in str(vc["Fund_Stage_Clean"]).lower():
-            score -= 1
-            reasons.append("valuation too high for seed-stage VC")
+def startup_profile(startup: Startup):
+    """Normalize the query side once, so scoring each VC is only comparisons."""
+    return {
+        "industry": normalize_industry(startup.industry),
+        "city": startup.city.lower().strip(),
+        "country": startup.country.lower().strip(),
+        "places": resolve(f"{startup.city}, {startup.country}"),
+        "investors": startup.has_investor.lower(),
+        "stage": infer_stage_from_valuation(startup.valuation),
+        "valuation": startup.valuation
+    }
 
+def score_vc(profile, vc, location_tier=None):
+    """
+    Score one VC row against a startup profile; returns (score, reasons).
+
+    location_tier is the VC's gazetteer match tier; None (startup location unknown to the
+    gazetteer) falls back to matching the raw location text.
+    """
+    score = 0
+    reasons = []
+    startup_industry = profile["industry"]
+
+    vc_focus = str(vc["Fund_Focus_Clean"])
+    # Sector code interned when the row was compiled or ingested; same result as normalize_industry(vc_focus)
+    vc_sector = vc["Sector_Primary"]
+    vc_industry_normalized = sector_name(vc_sector) if vc_sector >= 0 else vc_focus
+
+    if startup_industry == vc_industry_normalized:
+        score += 4
+        reasons.append(f"perfect industry match ({startup_industry})")
+    elif startup_industry in vc_focus or any(word in vc_focus for word in startup_industry.split()):
+        score += 3
+        reasons.append(f"industry overlap ({startup_industry})")
+    elif calculate_similarity(startup_industry, vc_focus) > 0.3:
+        score += 2
+        reasons.append("similar industry")
+
+    vc_location = str(vc["Location_Clean"])
+    if location_tier is not None:
+        if location_tier in LOCATION_POINTS:
+            points, reason = LOCATION_POINTS[location_tier]
+            score += points
+            reasons.append(reason)
+    elif profile["country"] in vc_location:
+        score += 2
+        reasons.append("same country")
+    elif profile["city"] in vc_location:
+        score += 1
+        reasons.append("same city")
+    elif any(region in vc_location for region in ['asia', 'europe', 'america']) and profile["country"] != 'united states':
+        score += 1
+        reasons.append("regional match")
+
+    if is_stage_compatible(profile["stage"], vc["Stage_Mask"]):
+        score += 2
+        reasons.append(f"stage fit ({stage_name(profile['stage'])})")
+
+    if check_existing_investor_match(profile["investors"], vc["Investor Name"]):
+        score += 1
+        reasons.append("existing investor")
+
+    if profile["valuation"] > 50 and vc["Stage_Mask"] & SEED_STAGES:
+        score -= 1
+        reasons.append("valuation too high for seed-stage VC")
+
+    return score, reasons
+
+# Score vectors per query; a new dataset generation gets fresh entries
+ranking_cache = RankingCache()
+
+def _rank(startup: Startup, table, key: str) -> RankedResults:
+    profile = startup_profile(startup)
+    # Location tiers of every VC at once: region/country/state comparisons over the
+    # resolved offices plus one radius query in the office k-d tree
+    tiers = location_index(table).tiers(profile["places"]) if profile["places"] else None
+    scores = []
+    results = []
+    for row, vc in enumerate(table.rows()):
+        score, reasons = score_vc(profile, vc, tiers[row] if tiers is not None else None)
+        scores.append(score)
         results.append({
             "name": vc["Investor Name"],
             "score": score,
@@ -152,6 +140,30 @@ def match(startup: Startup):
             "location": vc["Location"],
             "reason": " | ".join(reasons)
         })
+    return RankedResults(key, table.generation, scores, results)
+
+def ranked_matches(startup: Startup) -> RankedResults:
+    """All VCs scored for this startup, computed once per query and dataset generation."""
+    # Consistent snapshot of the VC table: zero-copy compiled base plus live ingested changes
+    table = investor_snapshot()
+    key = fingerprint(startup.dict())[:16]
+    # Identical concurrent lookups share one scoring pass
+    return ranking_cache.get_or_rank(
+        key, table.generation,
+        lambda: group("match").do(fingerprint(key, table.generation), lambda: _rank(startup, table, key))
+    )
 
-    top5 = sorted(results, key=lambda x: x["score"], reverse=True)[:5]
-    return {"matches": top5}
+@app.post("/api/match")
+def match(startup: Startup):
+    return {"matches": ranked_matches(startup).page(5)["items"]}
+
+@app.post("/api/match/ranked")
+def match_ranked(startup: Startup, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None):
+    """Browse the full ranking page by page (score desc, ties in dataset order); follow next_cursor."""
+    try:
+        return ranked_matches(startup).page(limit, cursor)
+    except StaleCursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
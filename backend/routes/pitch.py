@@ -1,10 +1,16 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional, Tuple
 from server.llm.agent import PitchAgent
 from server.llm.valuation import estimate_valuation
+from server.llm.outreach import DEFAULT_CONCURRENCY, MAX_CONCURRENCY
+from server.llm.singleflight import group, fingerprint
+from server.llm.deadline import DeadlineExceeded, RequestCancelled
+from server.routes.profiled import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 class StartupInfo(BaseModel):
     startup_name: str
@@ -44,46 +50,55 @@ class SectionImprovement(BaseModel):
     user_input: str
     startup_info: StartupInfo
 
+class SectionRegeneration(BaseModel):
+    section_name: str
+    pitch: Dict[str, Any]
+    startup_info: StartupInfo
+
 class InvestorMatch(BaseModel):
     investor_name: str
     firm_name: str
 
+class OutreachInvestor(BaseModel):
+    name: str
+    focus: Optional[str] = ''
+    stage: Optional[str] = ''
+    location: Optional[str] = ''
+
+class BulkEmailRequest(BaseModel):
+    startup_info: StartupInfo
+    investors: List[OutreachInvestor]
+    pitch: Optional[Dict[str, Any]] = None
+    your_name: Optional[str] = ''
+    your_email: Optional[str] = ''
+    llm_top_n: Optional[int] = None
+    concurrency: int = DEFAULT_CONCURRENCY
+
+def _http_error(e: Exception) -> HTTPException:
+    """499 when the client went away, 504 when the request deadline ran out, 500 otherwise."""
+    if isinstance(e, RequestCancelled):
+        return HTTPException(status_code=499, detail=str(e))
+    if isinstance(e, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
 @router.post('/generate_pitch')
 def generate_pitch(startup_info: StartupInfo):
-    try:
+    def run():
         # Initialize agent
         agent = PitchAgent()
         agent.set_startup_info(startup_info.dict())
         
-        # Generate pitch with confidence scoring
-        pitch_data = agent.generate_initial_pitch()
-        
-        # Get clarifying questions for low-confidence sections
-        questions = agent.get_clarifying_questions()
-        
-        # Get matching investors
-        matches = agent.match_investors()
-        
-        # Generate email if we have matches
-        email = None
-        if matches:
-            top_investor = {
-                'name': matches[0]['name'],
-                'firm': matches[0]['focus']
-            }
-            email = agent.generate_email(top_investor)
-        
-        return {
-            'pitch': pitch_data,
-            'confidence_scores': agent.confidence_scores,
-            'clarifying_questions': questions,
-            'investor_matches': matches[:5],
-            'email': email
-        }
+        # Pitch, clarifying questions, investor matches and email in one pipeline
+        return agent.run_workflow()
+
+    try:
+        # Double submits and teammates opening the same startup share one pipeline run
+        return group('generate_pitch').do(fingerprint(startup_info.dict()), run)
     except Exception as e:
         import logging
         logging.error(f'Error generating pitch: {str(e)}', exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
 
 @router.post('/improve_section')
 def improve_section(improvement: SectionImprovement):
@@ -107,10 +122,37 @@ def improve_section(improvement: SectionImprovement):
             'clarifying_questions': status['clarifying_questions']
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+
+@router.post('/regenerate_section')
+def regenerate_section(regeneration: SectionRegeneration):
+    """Regenerate one section of a pitch returned by /generate_pitch.
+
+    The weakest sections of every generated pitch are pre-generated in the background, so
+    this usually returns immediately ('speculative': true).
+    """
+    if regeneration.section_name not in regeneration.pitch:
+        raise HTTPException(status_code=404, detail=f'Section {regeneration.section_name} not found in pitch data')
+    agent = PitchAgent()
+    agent.set_startup_info(regeneration.startup_info.dict())
+    agent.pitch_data = regeneration.pitch
+    try:
+        regenerated = agent.regenerate_section(regeneration.section_name)
+    except Exception as e:
+        raise _http_error(e)
+
+    return {
+        'pitch': agent.pitch_data,
+        'confidence_scores': agent.confidence_scores,
+        'original': regenerated['original'],
+        'speculative': regenerated['speculative']
+    }
 
 @router.post('/match_investors', response_model=MatchResponse)
 def match_investors(profile: StartupInfo):
+    return group('match_investors').do(fingerprint(profile.dict()), lambda: _match_investors(profile))
+
+def _match_investors(profile: StartupInfo):
     try:
         # 1. Compute valuation estimate
         val = estimate_valuation(
@@ -131,7 +173,7 @@ def match_investors(profile: StartupInfo):
             'matches': matches[:5]
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
 
 @router.post('/generate_email')
 def generate_email(startup_info: StartupInfo, investor: InvestorMatch):
@@ -146,4 +188,46 @@ def generate_email(startup_info: StartupInfo, investor: InvestorMatch):
         email = agent.generate_email(investor.dict())
         return {'email': email}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+
+@router.post('/generate_email/stream')
+def stream_email(startup_info: StartupInfo, investor: InvestorMatch):
+    """Like /generate_email, but the email is streamed as plain text while it is written."""
+    try:
+        agent = PitchAgent()
+        agent.set_startup_info(startup_info.dict())
+        agent.generate_initial_pitch()
+        chunks = agent.stream_email(investor.dict())
+    except Exception as e:
+        raise _http_error(e)
+    return StreamingResponse(chunks, media_type='text/plain; charset=utf-8')
+
+@router.post('/bulk_emails')
+def bulk_emails(request: BulkEmailRequest):
+    """Stream one NDJSON line per investor as each personalized email is finished.
+
+    Investors are expected in rank order; those past `llm_top_n` get the template email.
+    If no pitch is supplied it is generated once and shared by all emails.
+    """
+    if not 1 <= request.concurrency <= MAX_CONCURRENCY:
+        raise HTTPException(status_code=422, detail=f'concurrency must be between 1 and {MAX_CONCURRENCY}')
+    try:
+        agent = PitchAgent()
+        agent.set_startup_info({
+            **request.startup_info.dict(),
+            'your_name': request.your_name,
+            'your_email': request.your_email
+        })
+        if request.pitch:
+            agent.pitch_data = request.pitch
+        else:
+            agent.generate_initial_pitch()
+    except Exception as e:
+        raise _http_error(e)
+
+    results = agent.generate_bulk_emails(
+        [investor.dict() for investor in request.investors],
+        llm_top_n=request.llm_top_n,
+        concurrency=request.concurrency
+    )
+    return StreamingResponse((json.dumps(result) + '\n' for result in results), media_type='application/x-ndjson')
\ No newline at end of file
@@ -0,0 +1,30 @@
+import asyncio
+from functools import wraps
+from fastapi.routing import APIRoute
+from server.llm.profiling import attach_thread
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute whose sync endpoint samples its threadpool thread when the request is profiled.
+
+    Sync endpoints run on a worker thread that is otherwise never attached to the request's
+    profile, so work outside spans and bind_context tasks would go unsampled. Async
+    endpoints share the event loop thread and are only covered by their spans.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "_profiled", False):
+            endpoint = _attached(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _attached(endpoint):
+    @wraps(endpoint)
+    def run(*args, **kwargs):
+        with attach_thread():
+            return endpoint(*args, **kwargs)
+
+    # include_router re-creates the route from this endpoint; wrap only once
+    run._profiled = True
+    return run
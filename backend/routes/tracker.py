@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Optional
+from server.services.tracker import get_store, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from server.routes.profiled import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+class OutreachRecord(BaseModel):
+    startup: str
+    investor: str
+    email: Optional[str] = ''
+    status: Optional[str] = 'Not Replied Yet'
+    notes: Optional[str] = ''
+
+class OutreachBatch(BaseModel):
+    records: List[OutreachRecord]
+
+@router.put('/tracker/outreach')
+def upsert_outreach(batch: OutreachBatch):
+    """Create or update outreach records (keyed by startup + investor) in one transaction."""
+    try:
+        written = get_store().upsert(record.dict() for record in batch.records)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {'upserted': written}
+
+@router.get('/tracker/outreach')
+def list_outreach(startup: Optional[str] = None, status: Optional[str] = None, investor: Optional[str] = None,
+                  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    """Filtered outreach records, most recently updated first; follow next_cursor for more."""
+    try:
+        return get_store().list_outreach(startup=startup, status=status, investor=investor, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.delete('/tracker/outreach')
+def delete_outreach(startup: str, investor: str):
+    if not get_store().delete(startup, investor):
+        raise HTTPException(status_code=404, detail='Outreach record not found')
+    return {'deleted': True}
+
+@router.get('/tracker/funnel')
+def outreach_funnel(startup: Optional[str] = None):
+    """Outreach counts per status, for one startup or overall."""
+    return get_store().funnel(startup)
@@ -0,0 +1,327 @@
+import io
+import math
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from server.llm.generator import PITCH_SECTIONS
+from server.services import ooxml_templates as ooxml
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", ".docx"),
+    "pptx": ("application/vnd.openxmlformats-officedocument.presentationml.presentation", ".pptx"),
+    "markdown": ("text/markdown; charset=utf-8", ".md"),
+}
+
+# Confidence colours, as in the pitch preview (text colour per graded sentence)
+CONFIDENCE_COLORS = {"green": "2E7D32", "orange": "EF6C00", "red": "C62828"}
+CONFIDENCE_MARKERS = {"green": "🟢", "orange": "🟠", "red": "🔴"}
+
+EXPORT_WORKERS = int(os.getenv("PITCHSENSE_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller batches render in the calling thread: starting work in the pool costs more than it saves
+POOL_MIN_DOCUMENTS = 8
+# Documents submitted to the pool ahead of the one being written out
+POOL_WINDOW = 2 * EXPORT_WORKERS
+MAX_BATCH_DOCUMENTS = 1000
+
+_INVALID_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+
+def confidence_color(confidence: float) -> str:
+    """Colour bucket of a score, matching the thresholds of the confidence scorer."""
+    if confidence >= 0.8:
+        return "green"
+    if confidence >= 0.5:
+        return "orange"
+    return "red"
+
+
+def _confidence(value: Any) -> float:
+    """A confidence score from client-supplied JSON, clamped to [0, 1]; anything non-numeric counts as 0."""
+    try:
+        confidence = float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+    if math.isnan(confidence):
+        return 0.0
+    return min(1.0, max(0.0, confidence))
+
+
+def section_title(name: str) -> str:
+    return name.replace("_", " ").title()
+
+
+def pitch_sections(pitch: Dict[str, Any]) -> List[Tuple[str, float, List[Tuple[str, str]]]]:
+    """
+    (title, confidence, [(sentence, colour), ...]) per section of a generate_pitch_json result.
+
+    Known sections come in pitch order, then any extras; a section without graded
+    sentences is one run coloured by its section confidence.
+    """
+    names = [name for name in PITCH_SECTIONS if name in pitch] + [name for name in pitch if name not in PITCH_SECTIONS]
+    sections = []
+    for name in names:
+        data = pitch[name]
+        if not isinstance(data, dict):
+            continue
+        confidence = _confidence(data.get("confidence"))
+        sentences = []
+        for sentence in data.get("sentences") or []:
+            if not isinstance(sentence, dict) or not sentence.get("text"):
+                continue
+            color = sentence.get("color")
+            if color not in CONFIDENCE_COLORS:
+                color = confidence_color(_confidence(sentence.get("confidence")))
+            sentences.append((str(sentence["text"]), color))
+        if not sentences and data.get("text"):
+            sentences = [(str(data["text"]), confidence_color(confidence))]
+        sections.append((section_title(name), confidence, sentences))
+    return sections
+
+
+def _xml(text: str) -> str:
+    return escape(_INVALID_XML.sub("", text))
+
+
+class OOXMLTemplate:
+    """A document package parsed once: static parts pre-encoded, dynamic parts precompiled."""
+
+    def __init__(self, static: Dict[str, str], dynamic: Dict[str, str]):
+        self.static = {name: content.encode("utf-8") for name, content in static.items()}
+        self.dynamic = {name: Template(content) for name, content in dynamic.items()}
+
+    def package(self, values: Dict[str, str], extra: Iterable[Tuple[str, str]] = ()) -> bytes:
+        parts = [(name, template.substitute(values)) for name, template in self.dynamic.items()]
+        parts += [*self.static.items(), *extra]
+        # [Content_Types].xml first; some readers expect it
+        parts.sort(key=lambda part: part[0] != "[Content_Types].xml")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+            for name, content in parts:
+                package.writestr(name, content)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def get_template(fmt: str) -> OOXMLTemplate:
+    if fmt == "docx":
+        return OOXMLTemplate(ooxml.DOCX_STATIC, ooxml.DOCX_DYNAMIC)
+    if fmt == "pptx":
+        return OOXMLTemplate(ooxml.PPTX_STATIC, ooxml.PPTX_DYNAMIC)
+    raise ValueError(f"No template for format: {fmt}")
+
+
+# --- Renderers: document = {"name": str, "pitch": generate_pitch_json result, "email": optional str} ---
+
+def _docx_paragraph(runs: List[Tuple[str, Optional[str]]], style: Optional[str] = None) -> str:
+    return ooxml.DOCX_PARAGRAPH.substitute(
+        properties=ooxml.DOCX_STYLE.substitute(style=style) if style else "",
+        runs="".join(
+            ooxml.DOCX_RUN.substitute(
+                properties=ooxml.DOCX_RUN_COLOR.substitute(color=CONFIDENCE_COLORS[color]) if color else "",
+                text=_xml(text)
+            )
+            for text, color in runs
+        )
+    )
+
+
+def render_docx(document: Dict[str, Any]) -> bytes:
+    body = [_docx_paragraph([(document["name"], None)], "Title")]
+    for title, confidence, sentences in pitch_sections(document["pitch"]):
+        body.append(_docx_paragraph([(f"{title} ({confidence:.0%} confidence)", None)], "Heading2"))
+        body.append(_docx_paragraph([(text + " ", color) for text, color in sentences]))
+    if document.get("email"):
+        body.append(_docx_paragraph([("Email", None)], "Heading1"))
+        body.extend(_docx_paragraph([(line, None)]) for line in document["email"].splitlines())
+    return get_template("docx").package({"body": "".join(body)})
+
+
+def _pptx_slide(title: str, paragraphs: List[List[Tuple[str, Optional[str]]]], title_size: int = 3200) -> str:
+    return ooxml.PPTX_SLIDE.substitute(
+        title=_xml(title),
+        title_size=title_size,
+        paragraphs="".join(
+            ooxml.PPTX_PARAGRAPH.substitute(runs="".join(
+                ooxml.PPTX_RUN.substitute(
+                    size=1800,
+                    fill=ooxml.PPTX_RUN_FILL.substitute(color=CONFIDENCE_COLORS[color]) if color else "",
+                    text=_xml(text)
+                )
+                for text, color in runs
+            ))
+            for runs in paragraphs
+        ) or "<a:p/>"
+    )
+
+
+def render_pptx(document: Dict[str, Any]) -> bytes:
+    slides = [_pptx_slide(document["name"], [[("Investor pitch", None)]], title_size=4400)]
+    for title, confidence, sentences in pitch_sections(document["pitch"]):
+        slides.append(_pptx_slide(
+            f"{title} ({confidence:.0%})",
+            [[(text, color)] for text, color in sentences]
+        ))
+    if document.get("email"):
+        slides.append(_pptx_slide("Email", [[(line, None)] for line in document["email"].splitlines()]))
+
+    numbers = range(1, len(slides) + 1)
+    values = {
+        "slide_overrides": "".join(ooxml.PPTX_SLIDE_OVERRIDE.substitute(n=n) for n in numbers),
+        # Slide ids start at 256; rId1/rId2 are the master and theme
+        "slide_ids": "".join(ooxml.PPTX_SLIDE_ID.substitute(id=255 + n, rid=f"rId{n + 2}") for n in numbers),
+        "slide_rels": "".join(ooxml.PPTX_SLIDE_REL.substitute(rid=f"rId{n + 2}", n=n) for n in numbers),
+    }
+    extra = []
+    for n, slide in zip(numbers, slides):
+        extra.append((f"ppt/slides/slide{n}.xml", slide))
+        extra.append((f"ppt/slides/_rels/slide{n}.xml.rels", ooxml.PPTX_SLIDE_RELS))
+    return get_template("pptx").package(values, extra)
+
+
+def render_markdown(document: Dict[str, Any]) -> bytes:
+    lines = [f"# {document['name']}", ""]
+    for title, confidence, sentences in pitch_sections(document["pitch"]):
+        lines += [f"## {title} ({confidence:.0%} confidence)", ""]
+        lines += [" ".join(f"{CONFIDENCE_MARKERS[color]} {text}" for text, color in sentences), ""]
+    if document.get("email"):
+        lines += ["## Email", "", document["email"].strip(), ""]
+    lines += ["---", "", "Confidence: 🟢 specific and supported · 🟠 plausible, could be sharper · 🔴 vague or unsupported", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+RENDERERS = {"docx": render_docx, "pptx": render_pptx, "markdown": render_markdown}
+
+
+def render(fmt: str, document: Dict[str, Any]) -> bytes:
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return RENDERERS[fmt](document)
+
+
+# --- Bulk export ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Parse the templates once per worker process, before the first document arrives
+    for fmt in ("docx", "pptx"):
+        get_template(fmt)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Not fork: the server process runs job, batcher and speculation threads whose locks a
+            # forked child could inherit mid-acquire. Forkserver children start from a clean process.
+            _pool = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def render_many(fmt: str, documents: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Rendered documents in input order; large batches fan out across the process pool.
+
+    At most POOL_WINDOW documents are in the pool at once: the next one is submitted only
+    as the oldest is taken, so finished documents never pile up ahead of the consumer.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if len(documents) < POOL_MIN_DOCUMENTS or EXPORT_WORKERS <= 1:
+        return (render(fmt, document) for document in documents)
+    return _render_windowed(fmt, documents)
+
+
+def _render_windowed(fmt: str, documents: List[Dict[str, Any]]) -> Iterator[bytes]:
+    pool = get_pool()
+    pending = deque()
+    try:
+        for document in documents:
+            if len(pending) >= POOL_WINDOW:
+                yield pending.popleft().result()
+            pending.append(pool.submit(render, fmt, document))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def export_filenames(documents: List[Dict[str, Any]], fmt: str) -> List[str]:
+    """Safe, unique archive member names derived from the document names."""
+    extension = EXPORT_FORMATS[fmt][1]
+    seen: Dict[str, int] = {}
+    names = []
+    for document in documents:
+        stem = _UNSAFE_FILENAME.sub("_", str(document.get("name") or "pitch")).strip("._") or "pitch"
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(f"{stem}{extension}" if seen[stem] == 1 else f"{stem}-{seen[stem]}{extension}")
+    return names
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(fmt: str, documents: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Zip archive of the rendered documents, yielded as each member is written.
+
+    The archive is written to an unseekable sink (sizes go in data descriptors), so only
+    the member in flight and the bounded render window are held in memory. DOCX/PPTX are
+    already deflated and are stored.
+    """
+    if len(documents) > MAX_BATCH_DOCUMENTS:
+        raise ValueError(f"At most {MAX_BATCH_DOCUMENTS} documents per export")
+    compression = zipfile.ZIP_DEFLATED if fmt == "markdown" else zipfile.ZIP_STORED
+    names = export_filenames(documents, fmt)
+    rendered = render_many(fmt, documents)
+
+    def chunks() -> Iterator[bytes]:
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, "w", compression) as archive:
+            for name, content in zip(names, rendered):
+                archive.writestr(name, content)
+                yield sink.drain()
+        yield sink.drain()
+
+    return chunks()
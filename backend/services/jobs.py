@@ -0,0 +1,305 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from server.llm.agent import PitchAgent
+from server.llm.datasets import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB = Path(os.getenv("PITCHSENSE_JOBS_DB", DATA_DIR / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("PITCHSENSE_JOB_WORKERS", "2"))
+
+# A running job whose lease was not renewed for this long is considered orphaned (worker
+# crashed or the process restarted) and is handed to another worker. Leases of running jobs
+# are renewed every HEARTBEAT_SECONDS, independently of how long a stage takes.
+LEASE_SECONDS = 30
+HEARTBEAT_SECONDS = 10
+POLL_SECONDS = 1.0
+MAX_ATTEMPTS = 3
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request_hash TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    partial TEXT NOT NULL DEFAULT '{}',
+    stages TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# A handler runs one job: handler(payload, report) -> result, where
+# report(stage, partial_result, seconds) persists progress after each stage.
+Handler = Callable[[Dict[str, Any], Callable[[str, Any, float], None]], Any]
+HANDLERS: Dict[str, Handler] = {}
+
+
+def register_handler(kind: str, handler: Handler):
+    HANDLERS[kind] = handler
+
+
+def request_hash(kind: str, payload: Dict[str, Any]) -> str:
+    """Idempotency key: identical submissions map to the same job."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{kind}:{canonical}".encode()).hexdigest()
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    for field in ("payload", "partial", "stages", "result"):
+        job[field] = json.loads(job[field]) if job[field] is not None else None
+    return job
+
+
+class JobQueue:
+    """
+    Durable job queue on a local SQLite database with an in-process worker pool.
+
+    Jobs are claimed atomically, so several worker processes can share one database.
+    Progress (partial results and per-stage timings) is written after every stage and feeds
+    the poll/stream endpoints. A heartbeat thread renews the lease of every job running in
+    this process; a job whose lease ran out is claimed again, so work survives a worker
+    restart. Each claim is fenced by its attempt number: once a job was re-claimed, writes
+    from the earlier attempt are ignored.
+    """
+
+    def __init__(self, path: Path = JOBS_DB, workers: int = JOB_WORKERS):
+        self.path = Path(path)
+        self.workers = workers
+        self._threads: List[threading.Thread] = []
+        # Job id -> attempt, for the jobs this process is running (renewed by the heartbeat)
+        self._running: Dict[str, int] = {}
+        self._running_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a job unless an identical one exists; returns (job, created).
+
+        A failed job is re-queued when resubmitted; queued, running and succeeded jobs are
+        returned as they are.
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = request_hash(kind, payload)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT * FROM jobs WHERE request_hash = ?", (key,)).fetchone()
+            created = row is None
+            if created:
+                job_id = uuid.uuid4().hex
+                db.execute(
+                    "INSERT INTO jobs (id, request_hash, kind, status, payload, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                    (job_id, key, kind, json.dumps(payload), now, now)
+                )
+            elif row["status"] == "failed":
+                job_id = row["id"]
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', error = NULL, attempts = 0, partial = '{}', "
+                    "stages = '{}', updated_at = ? WHERE id = ?",
+                    (now, job_id)
+                )
+            else:
+                job_id = row["id"]
+            db.execute("COMMIT")
+        self._wake.set()
+        return self.get(job_id), created
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job, or a running one whose lease expired.
+
+        A new attempt starts from scratch: progress left by an earlier attempt is cleared.
+        Jobs that already used MAX_ATTEMPTS are failed instead of claimed, so a job that
+        keeps killing its worker (OOM, native crash) is not retried forever.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired after ' || attempts || ' attempts', "
+                "finished_at = ?, updated_at = ? WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+                (now, now, now - LEASE_SECONDS, MAX_ATTEMPTS)
+            )
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'gave up after ' || attempts || ' attempts'), "
+                "finished_at = ?, updated_at = ? WHERE status = 'queued' AND attempts >= ?",
+                (now, now, MAX_ATTEMPTS)
+            )
+            row = db.execute(
+                "SELECT * FROM jobs WHERE attempts < ? AND (status = 'queued' "
+                "OR (status = 'running' AND updated_at < ?)) ORDER BY created_at LIMIT 1",
+                (MAX_ATTEMPTS, now - LEASE_SECONDS)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, partial = '{}', stages = '{}', "
+                "started_at = ?, updated_at = ? WHERE id = ?",
+                (now, now, row["id"])
+            )
+            db.execute("COMMIT")
+        job = _row_to_job(row)
+        job["attempts"] += 1
+        job["partial"], job["stages"] = {}, {}
+        return job
+
+    def _report(self, job: Dict[str, Any], stage: str, partial_result: Any, seconds: float):
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT partial, stages FROM jobs WHERE id = ? AND attempts = ?",
+                             (job["id"], job["attempts"])).fetchone()
+            if row is None:
+                # Re-claimed by another worker; this attempt's progress no longer counts
+                db.execute("COMMIT")
+                return
+            partial = json.loads(row["partial"])
+            stages = json.loads(row["stages"])
+            partial[stage] = partial_result
+            stages[stage] = {"seconds": round(seconds, 3), "finished_at": time.time()}
+            db.execute(
+                "UPDATE jobs SET partial = ?, stages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(partial), json.dumps(stages), time.time(), job["id"])
+            )
+            db.execute("COMMIT")
+
+    def _finish(self, job: Dict[str, Any], status: str, result: Any = None, error: Optional[str] = None):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND attempts = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, now, job["id"], job["attempts"])
+            )
+
+    def _run(self, job: Dict[str, Any]):
+        handler = HANDLERS.get(job["kind"])
+        with self._running_lock:
+            self._running[job["id"]] = job["attempts"]
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            result = handler(job["payload"], lambda stage, partial, seconds: self._report(job, stage, partial, seconds))
+            self._finish(job, "succeeded", result=result)
+        except Exception as e:
+            logger.error(f'Job {job["id"]} failed (attempt {job["attempts"]}): {str(e)}', exc_info=True)
+            if job["attempts"] < MAX_ATTEMPTS and handler is not None:
+                with self._connect() as db:
+                    db.execute("UPDATE jobs SET status = 'queued', error = ?, updated_at = ? WHERE id = ? AND attempts = ?",
+                               (str(e), time.time(), job["id"], job["attempts"]))
+            else:
+                self._finish(job, "failed", error=str(e))
+        finally:
+            with self._running_lock:
+                self._running.pop(job["id"], None)
+
+    def _heartbeat(self):
+        """Renew the leases of the jobs running in this process until the queue stops."""
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            with self._running_lock:
+                running = list(self._running.items())
+            if not running:
+                continue
+            now = time.time()
+            try:
+                with self._connect() as db:
+                    for job_id, attempts in running:
+                        renewed = db.execute(
+                            "UPDATE jobs SET updated_at = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+                            (now, job_id, attempts)
+                        ).rowcount
+                        if not renewed:
+                            logger.warning(f'Job {job_id} (attempt {attempts}) lost its lease')
+            except sqlite3.Error as e:
+                logger.warning(f'Job lease renewal failed: {str(e)}')
+
+    def _worker(self):
+        while not self._stop.is_set():
+            job = self._claim()
+            if job is None:
+                # Submissions in this process wake us up; other processes are picked up by polling
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def run_pitch_workflow(payload: Dict[str, Any], report: Callable[[str, Any, float], None]) -> Dict[str, Any]:
+    """Job handler for the full /generate_pitch pipeline."""
+    agent = PitchAgent()
+    agent.set_startup_info(payload)
+    return agent.run_workflow(on_stage=report)
+
+
+register_handler("pitch_workflow", run_pitch_workflow)
@@ -0,0 +1,160 @@
+from string import Template
+
+# Minimal hand-written Office Open XML packages for pitch exports. Static parts are copied
+# into every document as-is; dynamic parts are string.Template sources whose placeholders
+# the exporter fills. Only what Word/PowerPoint/LibreOffice need to open the file is here.
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+RELS_CT = "application/vnd.openxmlformats-package.relationships+xml"
+REL_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+REL_BASE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# --- DOCX ---
+
+DOCX_STATIC = {
+    "[Content_Types].xml": f"""{XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="{RELS_CT}"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>""",
+    "_rels/.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_OFFICE_DOCUMENT}" Target="word/document.xml"/>
+</Relationships>""",
+    "word/_rels/document.xml.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_BASE}/styles" Target="styles.xml"/>
+</Relationships>""",
+    "word/styles.xml": f"""{XML_DECLARATION}<w:styles xmlns:w="{NS_W}">
+<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Calibri"/><w:sz w:val="22"/></w:rPr></w:rPrDefault>
+<w:pPrDefault><w:pPr><w:spacing w:after="160" w:line="259" w:lineRule="auto"/></w:pPr></w:pPrDefault></w:docDefaults>
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/>
+<w:pPr><w:spacing w:after="240"/></w:pPr><w:rPr><w:b/><w:sz w:val="48"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/>
+<w:pPr><w:keepNext/><w:spacing w:before="360" w:after="120"/><w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/>
+<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="80"/><w:outlineLvl w:val="1"/></w:pPr><w:rPr><w:b/><w:sz w:val="26"/></w:rPr></w:style>
+</w:styles>""",
+}
+
+DOCX_DYNAMIC = {
+    "word/document.xml": f"""{XML_DECLARATION}<w:document xmlns:w="{NS_W}">
+<w:body>$body<w:sectPr><w:pgSz w:w="12240" w:h="15840"/><w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/></w:sectPr></w:body>
+</w:document>""",
+}
+
+DOCX_PARAGRAPH = Template('<w:p>$properties$runs</w:p>')
+DOCX_STYLE = Template('<w:pPr><w:pStyle w:val="$style"/></w:pPr>')
+DOCX_RUN = Template('<w:r>$properties<w:t xml:space="preserve">$text</w:t></w:r>')
+DOCX_RUN_COLOR = Template('<w:rPr><w:color w:val="$color"/></w:rPr>')
+
+# --- PPTX (16:9, one blank layout; every slide is a title box plus a body box) ---
+
+SLIDE_WIDTH = 12192000
+SLIDE_HEIGHT = 6858000
+
+_EMPTY_TREE = (
+    '<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+    '<p:grpSpPr/></p:spTree></p:cSld>'
+)
+
+_THEME_FILLS = '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3
+_THEME_LINES = '<a:ln w="9525"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>' * 3
+_THEME_EFFECTS = '<a:effectStyle><a:effectLst/></a:effectStyle>' * 3
+
+PPTX_STATIC = {
+    "_rels/.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_OFFICE_DOCUMENT}" Target="ppt/presentation.xml"/>
+</Relationships>""",
+    "ppt/slideMasters/slideMaster1.xml": f"""{XML_DECLARATION}<p:sldMaster xmlns:a="{NS_A}" xmlns:r="{NS_R}" xmlns:p="{NS_P}">
+{_EMPTY_TREE}
+<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" accent3="accent3" accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>
+<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst>
+</p:sldMaster>""",
+    "ppt/slideMasters/_rels/slideMaster1.xml.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_BASE}/slideLayout" Target="../slideLayouts/slideLayout1.xml"/>
+<Relationship Id="rId2" Type="{REL_BASE}/theme" Target="../theme/theme1.xml"/>
+</Relationships>""",
+    "ppt/slideLayouts/slideLayout1.xml": f"""{XML_DECLARATION}<p:sldLayout xmlns:a="{NS_A}" xmlns:r="{NS_R}" xmlns:p="{NS_P}" type="blank" preserve="1">
+{_EMPTY_TREE}
+<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr>
+</p:sldLayout>""",
+    "ppt/slideLayouts/_rels/slideLayout1.xml.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_BASE}/slideMaster" Target="../slideMasters/slideMaster1.xml"/>
+</Relationships>""",
+    "ppt/theme/theme1.xml": f"""{XML_DECLARATION}<a:theme xmlns:a="{NS_A}" name="PitchSense">
+<a:themeElements>
+<a:clrScheme name="PitchSense">
+<a:dk1><a:srgbClr val="000000"/></a:dk1><a:lt1><a:srgbClr val="FFFFFF"/></a:lt1>
+<a:dk2><a:srgbClr val="1F2937"/></a:dk2><a:lt2><a:srgbClr val="F3F4F6"/></a:lt2>
+<a:accent1><a:srgbClr val="2563EB"/></a:accent1><a:accent2><a:srgbClr val="16A34A"/></a:accent2>
+<a:accent3><a:srgbClr val="EA580C"/></a:accent3><a:accent4><a:srgbClr val="DC2626"/></a:accent4>
+<a:accent5><a:srgbClr val="7C3AED"/></a:accent5><a:accent6><a:srgbClr val="0891B2"/></a:accent6>
+<a:hlink><a:srgbClr val="2563EB"/></a:hlink><a:folHlink><a:srgbClr val="7C3AED"/></a:folHlink>
+</a:clrScheme>
+<a:fontScheme name="PitchSense">
+<a:majorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/></a:majorFont>
+<a:minorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/></a:minorFont>
+</a:fontScheme>
+<a:fmtScheme name="PitchSense">
+<a:fillStyleLst>{_THEME_FILLS}</a:fillStyleLst>
+<a:lnStyleLst>{_THEME_LINES}</a:lnStyleLst>
+<a:effectStyleLst>{_THEME_EFFECTS}</a:effectStyleLst>
+<a:bgFillStyleLst>{_THEME_FILLS}</a:bgFillStyleLst>
+</a:fmtScheme>
+</a:themeElements>
+</a:theme>""",
+}
+
+PPTX_DYNAMIC = {
+    "[Content_Types].xml": f"""{XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="{RELS_CT}"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/ppt/presentation.xml" ContentType="application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"/>
+<Override PartName="/ppt/slideMasters/slideMaster1.xml" ContentType="application/vnd.openxmlformats-officedocument.presentationml.slideMaster+xml"/>
+<Override PartName="/ppt/slideLayouts/slideLayout1.xml" ContentType="application/vnd.openxmlformats-officedocument.presentationml.slideLayout+xml"/>
+<Override PartName="/ppt/theme/theme1.xml" ContentType="application/vnd.openxmlformats-officedocument.theme+xml"/>
+$slide_overrides</Types>""",
+    "ppt/presentation.xml": f"""{XML_DECLARATION}<p:presentation xmlns:a="{NS_A}" xmlns:r="{NS_R}" xmlns:p="{NS_P}">
+<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>
+<p:sldIdLst>$slide_ids</p:sldIdLst>
+<p:sldSz cx="{SLIDE_WIDTH}" cy="{SLIDE_HEIGHT}"/>
+<p:notesSz cx="6858000" cy="9144000"/>
+</p:presentation>""",
+    "ppt/_rels/presentation.xml.rels": f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_BASE}/slideMaster" Target="slideMasters/slideMaster1.xml"/>
+<Relationship Id="rId2" Type="{REL_BASE}/theme" Target="theme/theme1.xml"/>
+$slide_rels</Relationships>""",
+}
+
+PPTX_SLIDE_OVERRIDE = Template(
+    '<Override PartName="/ppt/slides/slide$n.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>\n'
+)
+PPTX_SLIDE_ID = Template('<p:sldId id="$id" r:id="$rid"/>')
+PPTX_SLIDE_REL = Template(f'<Relationship Id="$rid" Type="{REL_BASE}/slide" Target="slides/slide$n.xml"/>\n')
+
+PPTX_SLIDE = Template(f"""{XML_DECLARATION}<p:sld xmlns:a="{NS_A}" xmlns:r="{NS_R}" xmlns:p="{NS_P}">
+<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>
+<p:sp><p:nvSpPr><p:cNvPr id="2" name="Title"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>
+<p:spPr><a:xfrm><a:off x="609600" y="457200"/><a:ext cx="10972800" cy="1143000"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>
+<p:txBody><a:bodyPr wrap="square" anchor="b"><a:normAutofit/></a:bodyPr><a:lstStyle/>
+<a:p><a:r><a:rPr lang="en-US" sz="$title_size" b="1"/><a:t>$title</a:t></a:r></a:p></p:txBody></p:sp>
+<p:sp><p:nvSpPr><p:cNvPr id="3" name="Body"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>
+<p:spPr><a:xfrm><a:off x="609600" y="1752600"/><a:ext cx="10972800" cy="4572000"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>
+<p:txBody><a:bodyPr wrap="square"><a:normAutofit/></a:bodyPr><a:lstStyle/>$paragraphs</p:txBody></p:sp>
+</p:spTree></p:cSld>
+<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr>
+</p:sld>""")
+PPTX_SLIDE_RELS = f"""{XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{REL_BASE}/slideLayout" Target="../slideLayouts/slideLayout1.xml"/>
+</Relationships>"""
+PPTX_PARAGRAPH = Template('<a:p>$runs</a:p>')
+PPTX_RUN = Template('<a:r><a:rPr lang="en-US" sz="$size">$fill</a:rPr><a:t>$text</a:t></a:r>')
+PPTX_RUN_FILL = Template('<a:solidFill><a:srgbClr val="$color"/></a:solidFill>')
@@ -0,0 +1,194 @@
+import base64
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from server.llm.datasets import DATA_DIR
+
+TRACKER_DB = Path(os.getenv("PITCHSENSE_TRACKER_DB", DATA_DIR / "tracker.sqlite3"))
+
+# Same vocabulary as the frontend tracker page
+STATUSES = ["Not Replied Yet", "Contacted", "Replied", "Intro Requested", "Not a Fit"]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Rows per executemany call in a bulk upsert (all chunks share one transaction)
+UPSERT_CHUNK = 1000
+
+# Listings are ordered by (updated_at DESC, id DESC) and paginated with a keyset cursor,
+# so every page is an index range scan no matter how deep it is. Each filter combination
+# the API offers has an index ending in that order.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach (
+    id INTEGER PRIMARY KEY,
+    startup TEXT NOT NULL,
+    investor TEXT NOT NULL,
+    email TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (startup, investor)
+);
+CREATE INDEX IF NOT EXISTS outreach_updated ON outreach (updated_at, id);
+CREATE INDEX IF NOT EXISTS outreach_startup_updated ON outreach (startup, updated_at, id);
+CREATE INDEX IF NOT EXISTS outreach_startup_status_updated ON outreach (startup, status, updated_at, id);
+CREATE INDEX IF NOT EXISTS outreach_investor_updated ON outreach (investor, updated_at, id);
+CREATE INDEX IF NOT EXISTS outreach_status_updated ON outreach (status, updated_at, id);
+"""
+
+UPSERT = """
+INSERT INTO outreach (startup, investor, email, status, notes, created_at, updated_at)
+VALUES (:startup, :investor, :email, :status, :notes, :now, :now)
+ON CONFLICT (startup, investor) DO UPDATE SET
+    email = CASE WHEN excluded.email != '' THEN excluded.email ELSE outreach.email END,
+    status = excluded.status,
+    notes = CASE WHEN excluded.notes != '' THEN excluded.notes ELSE outreach.notes END,
+    updated_at = excluded.updated_at
+"""
+
+COLUMNS = "id, startup, investor, email, status, notes, created_at, updated_at"
+
+
+def encode_cursor(updated_at: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{updated_at!r}:{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        updated_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(updated_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class TrackerStore:
+    """
+    Outreach status per (startup, investor), persisted in a local SQLite database.
+
+    Writes are batched into single transactions, listings use keyset pagination over
+    matching indexes, and funnel counts are GROUP BY queries answered from an index,
+    so none of the operations scan the table.
+    """
+
+    def __init__(self, path: Path = TRACKER_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or update outreach records in one transaction; returns how many were written.
+
+        Each record needs startup, investor and status; email and notes are optional and
+        keep their stored value when empty.
+        """
+        now = time.time()
+        rows = []
+        for record in records:
+            status = record.get("status") or STATUSES[0]
+            if status not in STATUSES:
+                raise ValueError(f"Unknown status: {status}")
+            if not record.get("startup") or not record.get("investor"):
+                raise ValueError("startup and investor are required")
+            rows.append({
+                "startup": record["startup"],
+                "investor": record["investor"],
+                "email": record.get("email") or "",
+                "status": status,
+                "notes": record.get("notes") or "",
+                "now": now
+            })
+
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(rows), UPSERT_CHUNK):
+                    db.executemany(UPSERT, rows[start:start + UPSERT_CHUNK])
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def delete(self, startup: str, investor: str) -> bool:
+        with self._connect() as db:
+            cursor = db.execute("DELETE FROM outreach WHERE startup = ? AND investor = ?", (startup, investor))
+            return cursor.rowcount > 0
+
+    def list_outreach(self, startup: Optional[str] = None, status: Optional[str] = None, investor: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of outreach records, most recently updated first.
+
+        Returns {'items': [...], 'next_cursor': str or None}; pass next_cursor back to get
+        the following page.
+        """
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Unknown status: {status}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where, params = [], []
+        for column, value in (("startup", startup), ("status", status), ("investor", investor)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if cursor:
+            updated_at, row_id = decode_cursor(cursor)
+            where.append("(updated_at, id) < (?, ?)")
+            params.extend([updated_at, row_id])
+
+        sql = f"SELECT {COLUMNS} FROM outreach"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._connect() as db:
+            rows = [dict(row) for row in db.execute(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+        return {"items": rows, "next_cursor": next_cursor}
+
+    def funnel(self, startup: Optional[str] = None) -> Dict[str, Any]:
+        """Outreach count per status (every status present, in funnel order) plus the total."""
+        sql = "SELECT status, COUNT(*) AS n FROM outreach"
+        params: List[Any] = []
+        if startup is not None:
+            sql += " WHERE startup = ?"
+            params.append(startup)
+        sql += " GROUP BY status"
+
+        with self._connect() as db:
+            counts = {row["status"]: row["n"] for row in db.execute(sql, params)}
+        statuses = {status: counts.get(status, 0) for status in STATUSES}
+        return {"total": sum(counts.values()), "statuses": statuses}
+
+
+_store: Optional[TrackerStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> TrackerStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TrackerStore()
+        return _store
@@ -0,0 +1,41 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    'server.llm.openai_client',
+    'server.llm.anthropic_client',
+    'server.llm.datasets',
+    'server.llm.agent',
+    'server.routes.pitch',
+    'server.routes.match_api',
+    'server.main',
+]
+
+SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+def bench_import():
+    """Measure cold import time of the backend modules, each in a fresh interpreter."""
+    parser = argparse.ArgumentParser(description="Benchmark cold import time of PitchSense modules.")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module')
+    args = parser.parse_args()
+
+    print(f"{'module':<32} {'min ms':>8} {'median ms':>10}")
+    for module in args.modules:
+        timings = []
+        for _ in range(args.runs):
+            result = subprocess.run(
+                [sys.executable, '-c', SNIPPET.format(module=module)],
+                capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                print(f"{module:<32} failed: {result.stderr.strip().splitlines()[-1]}")
+                break
+            timings.append(float(result.stdout.strip()) * 1000)
+        else:
+            print(f"{module:<32} {min(timings):>8.1f} {statistics.median(timings):>10.1f}")
+
+if __name__ == '__main__':
+    bench_import()
@@ -0,0 +1,16 @@
+import argparse
+from server.llm.datasets import TABLES, build_table
+
+def build_datasets():
+    """Compile every CSV in data/ into the columnar dataset cache."""
+    parser = argparse.ArgumentParser(description="Build the PitchSense dataset cache.")
+    parser.add_argument('tables', nargs='*', default=list(TABLES), help='Datasets to build (default: all)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the source checksum is unchanged')
+    args = parser.parse_args()
+
+    for name in args.tables:
+        manifest = build_table(name, force=args.force)
+        print(f"{name}: {manifest['rows']} rows from {manifest['source']} ({manifest['source_sha256'][:12]})")
+
+if __name__ == '__main__':
+    build_datasets()
@@ -1,35 +1,75 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
-import pandas as pd
+from .context import bind_context
+from .deadline import DeadlineExceeded, RequestCancelled, has_time
 from .llm_router import route_llm_call
+from .gazetteer import location_index, resolve, specificity
+from .investors import investor_snapshot
+from .prompts import PromptTemplate, register_template
+from .taxonomy import ALL_STAGES, sector_mask, stage_mask
+
+INSIGHT_TEMPLATE = register_template(PromptTemplate(
+    name="investor_insight",
+    version="2",
+    prefix="""Analyze a potential investor match for a startup.
+Provide a brief, specific reason why this could be a good match, focusing on unique synergies.
+Return only a single sentence without any prefixes or formatting.
+""",
+    suffix="""
+Startup: {startup_name} (industry: {industry})
+
+Investor: {name}
+Focus Areas: {focus}
+Stage: {stage}
+Location: {location}"""
+))
+
+# Insights are not requested with less time than this left on the deadline
+INSIGHT_MIN_SECONDS = 2.0
 
 def match_vc_to_startup_enhanced(startup_name: str, industry: str, stage: str = "", location: str = "") -> List[Dict[str, Any]]:
     """Match startup to VCs using both data-driven and LLM-enhanced matching."""
-    # Load VC dataset
-    df_vc = pd.read_csv("VC_FundStage_Location_Sector.csv")
-    
-    # Clean and normalize data
-    df_vc["Fund_Focus_Clean"] = df_vc["Fund Focus (Sectors)"].fillna("").str.lower().str.strip()
-    df_vc["Location_Clean"] = df_vc["Location"].fillna("").str.lower().str.strip()
-    df_vc["Fund_Stage_Clean"] = df_vc["Fund Stage"].fillna("").str.lower().str.strip()
-    
-    # Initial filtering
+    # Query terms resolved to taxonomy bitmasks once; terms outside the taxonomy fall back
+    # to substring search over the precleaned text
+    industry_bits = sector_mask(industry)
+    industry_terms = [ind.strip().lower() for ind in industry.split(",")]
+    stage_bits = stage_mask(stage) & ALL_STAGES if stage else 0
+
+    # Initial filtering over a snapshot of the shared, precleaned VC table (with live changes)
+    table = investor_snapshot()
+    # A VC matches the location when one of its offices is inside the queried place: same
+    # metro area for a city, same state/country/region otherwise (gazetteer tiers for all
+    # VCs at once); unknown places fall back to substring search
+    places = resolve(location) if location else ()
+    location_tiers = location_index(table).tiers(places) if places else None
+    required_tier = min(specificity(place) for place in places) if places else None
+
     matches = []
-    for _, vc in df_vc.iterrows():
+    for row, vc in enumerate(table.rows()):
         score = 0
         reasons = []
         
         # Industry match
-        if any(ind.lower() in vc["Fund_Focus_Clean"] for ind in industry.lower().split(",")):
+        if industry_bits:
+            industry_match = vc["Sector_Mask"] & industry_bits
+        else:
+            industry_match = any(ind in vc["Fund_Focus_Clean"] for ind in industry_terms)
+        if industry_match:
             score += 0.4
             reasons.append(f"Industry focus match: {vc['Fund Focus (Sectors)']}")
         
         # Stage match (if provided)
-        if stage and stage.lower() in vc["Fund_Stage_Clean"]:
+        if stage and (vc["Stage_Mask"] & stage_bits if stage_bits else stage.lower() in vc["Fund_Stage_Clean"]):
             score += 0.3
             reasons.append(f"Stage match: {vc['Fund Stage']}")
             
         # Location match (if provided)
-        if location and location.lower() in vc["Location_Clean"]:
+        if location_tiers is not None:
+            location_match = location_tiers[row] >= required_tier
+        else:
+            location_match = location and location.lower() in vc["Location_Clean"]
+        if location_match:
             score += 0.3
             reasons.append(f"Location match: {vc['Location']}")
         
@@ -43,29 +83,42 @@ def match_vc_to_startup_enhanced(startup_name: str, industry: str, stage: str =
                 "location": vc["Location"]
             })
     
-    # Sort by match score
-    matches.sort(key=lambda x: x["match_score"], reverse=True)
-    
-    # Use LLM to enhance top matches with personalized insights
-    enhanced_matches = []
-    for match in matches[:5]:  # Enhance top 5 matches
-        prompt = f"""Analyze this potential investor match for {startup_name} (industry: {industry}):
-
-Investor: {match['name']}
-Focus Areas: {match['focus']}
-Stage: {match['stage']}
-Location: {match['location']}
-
-Provide a brief, specific reason why this could be a good match, focusing on unique synergies.
-Return only a single sentence without any prefixes or formatting."""
-        
-        insight = route_llm_call(
-            task_type="pitch_block",
-            prompt=prompt,
-            max_tokens=100
+    # Use LLM to enhance top matches with personalized insights. The calls are issued
+    # concurrently and marked batchable, so the micro-batcher packs them into one request.
+    # Insights are extras: when the deadline runs short they are left empty, not waited for.
+    def add_insight(match: Dict[str, Any]) -> Dict[str, Any]:
+        match["personalized_insight"] = ""
+        if not has_time(INSIGHT_MIN_SECONDS):
+            return match
+        prompt = INSIGHT_TEMPLATE.render(
+            startup_name=startup_name,
+            industry=industry,
+            name=match['name'],
+            focus=match['focus'],
+            stage=match['stage'],
+            location=match['location']
         )
         
+        try:
+            insight = route_llm_call(
+                task_type="investor_insight",
+                prompt=prompt,
+                max_tokens=100,
+                batch=True
+            )
+        except RequestCancelled:
+            raise
+        except DeadlineExceeded:
+            return match
+        
         match["personalized_insight"] = insight.strip()
-        enhanced_matches.append(match)
+        return match
     
-    return enhanced_matches
\ No newline at end of file
+    # Top 5 by match score (ties keep dataset order) without sorting every match
+    top_matches = [match for _, _, match in heapq.nsmallest(
+        5, ((-match["match_score"], index, match) for index, match in enumerate(matches))
+    )]
+    if not top_matches:
+        return []
+    with ThreadPoolExecutor(max_workers=len(top_matches)) as executor:
+        return list(executor.map(bind_context(add_insight), top_matches))
@@ -1,4 +1,48 @@
 from typing import Dict, Any, Tuple
+from .gazetteer import place_chain
+from .taxonomy import STAGE_CODES, SECTOR_CODES, stage_code, sector_code
+
+# Base ranges by funding stage ($M), keyed by taxonomy stage code
+STAGE_RANGES: Dict[int, Tuple[float, float]] = {
+    STAGE_CODES["pre-seed"]: (0.5, 2),
+    STAGE_CODES["seed"]: (2, 7),
+    STAGE_CODES["series a"]: (8, 30),
+    STAGE_CODES["series b"]: (30, 100),
+    STAGE_CODES["series c"]: (80, 250),
+    STAGE_CODES["series d"]: (200, 500),
+    STAGE_CODES["pre-ipo"]: (500, 5000),
+}
+
+# Industry multipliers, keyed by taxonomy sector code (most specific sector wins)
+INDUSTRY_MULT: Dict[int, float] = {
+    SECTOR_CODES["artificial intelligence"]: 1.4,
+    SECTOR_CODES["fintech"]: 1.3,
+    SECTOR_CODES["health"]: 1.5,
+    SECTOR_CODES["biotech"]: 1.6,
+    SECTOR_CODES["edtech"]: 0.9,
+    SECTOR_CODES["ecommerce"]: 1.0,
+    SECTOR_CODES["supply chain"]: 1.2,
+    SECTOR_CODES["other"]: 1.0,
+}
+
+# Location multipliers, keyed by gazetteer place id. A location takes the value of its own
+# place, else of the nearest listed city in its metro area, else of its state/country/region.
+LOCATION_MULT: Dict[str, float] = {
+    "city:san-francisco": 1.3,
+    "city:new-york": 1.2,
+    "city:london": 1.1,
+    "city:beijing": 1.2,
+    "city:shanghai": 1.1,
+    "country:in": 0.9,
+    "city:jakarta": 0.9,
+    "city:sao-paulo": 0.9,
+}
+
+def location_multiplier(location: str) -> float:
+    for place_id in place_chain(location):
+        if place_id in LOCATION_MULT:
+            return LOCATION_MULT[place_id]
+    return 1.0
 
 def estimate_valuation(
     stage: str,
@@ -10,42 +54,6 @@ def estimate_valuation(
     Estimates startup valuation based on stage, industry, location, and age.
     Returns valuation range and multiplier details.
     """
-    # Base ranges by funding stage ($M)
-    stage_ranges: Dict[str, Tuple[float, float]] = {
-        "Pre-Seed": (0.5, 2),
-        "Seed": (2, 7),
-        "Series A": (8, 30),
-        "Series B": (30, 100),
-        "Series C": (80, 250),
-        "Series D": (200, 500),
-        "Pre-IPO": (500, 5000),
-    }
-
-    # Industry multipliers
-    industry_mult: Dict[str, float] = {
-        "Artificial Intelligence": 1.4,
-        "Fintech": 1.3,
-        "Healthtech": 1.5,
-        "Biotech": 1.6,
-        "Edtech": 0.9,
-        "E-commerce": 1.0,
-        "Supply Chain": 1.2,
-        "Other": 1.0,
-    }
-
-    # Location multipliers
-    location_mult: Dict[str, float] = {
-        "San Francisco": 1.3,
-        "New York": 1.2,
-        "London": 1.1,
-        "Beijing": 1.2,
-        "Shanghai": 1.1,
-        "India": 0.9,
-        "Jakarta": 0.9,
-        "Sao Paulo": 0.9,
-        "Other": 1.0,
-    }
-
     # Age multiplier (years since founding)
     if age < 1:
         age_mult = 0.8
@@ -59,9 +67,9 @@ def estimate_valuation(
         age_mult = 1.0
 
     # Calculate base range and multipliers
-    base_low, base_high = stage_ranges.get(stage, (5, 20))
-    ind = industry_mult.get(industry, 1.0)
-    loc = location_mult.get(location, 1.0)
+    base_low, base_high = STAGE_RANGES.get(stage_code(stage), (5, 20))
+    ind = INDUSTRY_MULT.get(sector_code(industry), 1.0)
+    loc = location_multiplier(location)
     combined = ind * loc * age_mult
 
     return {